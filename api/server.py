@@ -0,0 +1,285 @@
+import asyncio
+import hashlib
+import logging
+import os
+import secrets
+import time
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+from config.config import load_config
+from utils.database import Database, DatabaseUnavailable
+from utils.geozones import GeozoneIndex, mission_geozones
+from utils.mission import build_mission_xml
+from utils.route import compute_route, validate_coordinate
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_ROUTES = 500
+MAX_BATCH_WAYPOINTS = 50_000
+ENGINE_CONCURRENCY = 4
+KEY_CACHE_TTL = 60.0
+# Unknown keys are remembered briefly so retries do not hit the database
+INVALID_KEY_CACHE_TTL = 10.0
+KEY_CACHE_MAX_ENTRIES = 10_000
+
+DB_KEY = web.AppKey("db", Database)
+ENGINE_LIMIT_KEY = web.AppKey("engine_limit", asyncio.Semaphore)
+KEY_CACHE_KEY = web.AppKey("key_cache", dict)
+GEOZONES_KEY = web.AppKey("geozones", GeozoneIndex)
+
+
+# ===================== API KEYS =====================
+
+def generate_api_key() -> str:
+    """New random API key (only its hash is stored)"""
+    return secrets.token_urlsafe(32)
+
+
+def hash_api_key(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _prune_key_cache(cache: Dict[str, tuple], now: float):
+    """Drop expired entries; if all are live, start over"""
+    for key_hash in [k for k, (expires, _) in cache.items() if expires < now]:
+        del cache[key_hash]
+    if len(cache) >= KEY_CACHE_MAX_ENTRIES:
+        cache.clear()
+
+
+@web.middleware
+async def auth_middleware(request: web.Request, handler):
+    """Require a valid ``X-API-Key`` header (except for /api/health)"""
+    if request.path == "/api/health":
+        return await handler(request)
+
+    key = request.headers.get("X-API-Key")
+    if not key:
+        raise web.HTTPUnauthorized(text='{"error": "missing X-API-Key"}', content_type="application/json")
+
+    key_hash = hash_api_key(key)
+    cache: Dict[str, tuple] = request.app[KEY_CACHE_KEY]
+    cached = cache.get(key_hash)
+    now = time.monotonic()
+
+    if cached is None or cached[0] < now:
+        try:
+            row = await request.app[DB_KEY].get_api_key(key_hash)
+        except DatabaseUnavailable:
+            raise web.HTTPServiceUnavailable(
+                text='{"error": "database unavailable"}', content_type="application/json"
+            )
+        if len(cache) >= KEY_CACHE_MAX_ENTRIES:
+            _prune_key_cache(cache, now)
+        if row is None:
+            cached = (now + INVALID_KEY_CACHE_TTL, None)
+        else:
+            cached = (now + KEY_CACHE_TTL, row["name"])
+        cache[key_hash] = cached
+
+    if cached[1] is None:
+        raise web.HTTPUnauthorized(text='{"error": "invalid API key"}', content_type="application/json")
+
+    request["api_client"] = cached[1]
+    return await handler(request)
+
+
+# ===================== VALIDATION =====================
+
+def _is_number(value: Any) -> bool:
+    # bool is an int subclass; JSON true/false are not numbers here
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _json_int(value: Any, field: str) -> int:
+    """Integer JSON field; integral floats (``3.0``) are accepted"""
+    if not _is_number(value) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f"'{field}' must be an integer")
+    return int(value)
+
+
+def _json_point(value: Any, field: str):
+    if not isinstance(value, list) or len(value) != 2 or not all(_is_number(v) for v in value):
+        raise ValueError(f"'{field}' must be [lat, lon]")
+    return validate_coordinate(value)
+
+
+# ===================== ENGINE =====================
+
+def _route_payload(geozones: GeozoneIndex, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one route request and compute it (runs in a worker thread)"""
+    point_a = _json_point(spec["a"], "a")
+    point_b = _json_point(spec["b"], "b")
+    segments = _json_int(spec["segments"], "segments")
+
+    altitudes = spec.get("altitudes", [50])
+    if not isinstance(altitudes, list):
+        raise ValueError("'altitudes' must be a list of integers")
+    altitudes = [_json_int(a, f"altitudes[{i}]") for i, a in enumerate(altitudes)]
+
+    route = compute_route(point_a, point_b, segments, altitudes)
+    conflicts = geozones.check_route(route.points)
+
+    result = {
+        "ok": True,
+        "points": [list(p) for p in route.points],
+        "distances_m": [round(d, 3) for d in route.distances],
+        "total_km": round(route.total_km, 6),
+        "geozone_conflicts": [
+            {"segment": c.segment, "zone": c.zone.name} for c in conflicts
+        ],
+    }
+    if spec.get("mission", True):
+        zones, _ = mission_geozones(conflicts)
+        result["mission_xml"] = build_mission_xml(route.points, geozones=zones)
+    return result
+
+
+def _declared_waypoints(spec: Any) -> int:
+    try:
+        return max(_json_int(spec["segments"], "segments"), 0) + 1
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return 0
+
+
+async def _compute(app: web.Application, spec: Any) -> Dict[str, Any]:
+    if not isinstance(spec, dict):
+        return {"ok": False, "error": "object expected"}
+    async with app[ENGINE_LIMIT_KEY]:
+        try:
+            return await asyncio.to_thread(_route_payload, app[GEOZONES_KEY], spec)
+        except KeyError as e:
+            return {"ok": False, "error": f"missing field {e}"}
+        except (TypeError, ValueError, OverflowError) as e:
+            return {"ok": False, "error": str(e) or type(e).__name__}
+
+
+async def _read_json(request: web.Request) -> Any:
+    try:
+        return await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text='{"error": "invalid JSON"}', content_type="application/json")
+
+
+# ===================== ROUTES =====================
+
+async def health(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok"})
+
+
+async def route_single(request: web.Request) -> web.Response:
+    """
+    POST /api/route
+    {"a": [lat, lon], "b": [lat, lon], "segments": 10,
+     "altitudes": [50, 60, 70], "mission": true}
+    """
+    spec = await _read_json(request)
+    result = await _compute(request.app, spec)
+    return web.json_response(result, status=200 if result["ok"] else 422)
+
+
+async def route_batch(request: web.Request) -> web.Response:
+    """
+    POST /api/routes/batch
+    {"routes": [<route request>, ...]} → {"results": [...]} in the same order
+    """
+    body = await _read_json(request)
+    routes = body.get("routes") if isinstance(body, dict) else None
+    if not isinstance(routes, list) or not routes:
+        raise web.HTTPBadRequest(text='{"error": "routes list expected"}', content_type="application/json")
+    if len(routes) > MAX_BATCH_ROUTES:
+        raise web.HTTPRequestEntityTooLarge(
+            max_size=MAX_BATCH_ROUTES, actual_size=len(routes),
+            text=f'{{"error": "at most {MAX_BATCH_ROUTES} routes per batch"}}',
+            content_type="application/json",
+        )
+
+    waypoints = sum(_declared_waypoints(spec) for spec in routes)
+    if waypoints > MAX_BATCH_WAYPOINTS:
+        raise web.HTTPRequestEntityTooLarge(
+            max_size=MAX_BATCH_WAYPOINTS, actual_size=waypoints,
+            text=f'{{"error": "at most {MAX_BATCH_WAYPOINTS} waypoints per batch"}}',
+            content_type="application/json",
+        )
+
+    results = await asyncio.gather(*(_compute(request.app, spec) for spec in routes))
+    logger.info(f"🌐 API batch of {len(routes)} routes for {request['api_client']}")
+    return web.json_response({"results": results})
+
+
+# ===================== APPLICATION =====================
+
+def create_app(
+    db: Database,
+    concurrency: int = ENGINE_CONCURRENCY,
+    geozones: Optional[GeozoneIndex] = None,
+) -> web.Application:
+    """
+    Build the HTTP API application on top of the shared route engine.
+
+    :param db: database wrapper (API keys)
+    :param concurrency: routes computed at the same time
+    :param geozones: restricted zones checked for every route
+    """
+    app = web.Application(middlewares=[auth_middleware], client_max_size=8 * 1024 * 1024)
+    app[DB_KEY] = db
+    app[ENGINE_LIMIT_KEY] = asyncio.Semaphore(concurrency)
+    app[KEY_CACHE_KEY] = {}
+    app[GEOZONES_KEY] = geozones or GeozoneIndex()
+
+    app.router.add_get("/api/health", health)
+    app.router.add_post("/api/route", route_single)
+    app.router.add_post("/api/routes/batch", route_batch)
+    return app
+
+
+async def start_api(
+    db: Database,
+    host: str,
+    port: int,
+    geozones: Optional[GeozoneIndex] = None,
+) -> web.AppRunner:
+    """Start the API inside the running event loop (next to the bot)"""
+    runner = web.AppRunner(create_app(db, geozones=geozones))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"🌐 HTTP API listening on {host}:{port}")
+    return runner
+
+
+async def run_standalone(host: Optional[str] = None, port: Optional[int] = None):
+    """Run the API as a separate process"""
+    config = load_config()
+    db = Database(dsn=config.database.dsn)
+    await db.connect()
+    await db.create_tables()
+
+    geozones = GeozoneIndex()
+    if os.path.exists(config.geozones.path):
+        count = await asyncio.to_thread(geozones.load, config.geozones.path)
+        logger.info(f"🚫 Loaded {count} geozones from {config.geozones.path}")
+
+    runner = await start_api(db, host or config.api.host, port or config.api.port, geozones)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        await db.disconnect()
+
+
+def main() -> None:
+    """CLI entry point: python -m api.server"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+    )
+    try:
+        asyncio.run(run_standalone())
+    except KeyboardInterrupt:
+        logger.info("👋 API stopped by KeyboardInterrupt")
+
+
+if __name__ == "__main__":
+    main()
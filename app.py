@@ -1,12 +1,14 @@
 import asyncio
 import logging
+import os
 
 from aiogram import Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 
-from my_loaders import bot, db, config
-from handlers import start, location, about, help
+from my_loaders import bot, db, config, storage, spool, sender, previewer, matrix_workers, geozones
+from handlers import start, location, survey, matrix, preview, admin, about, help
 from utils.set_my_command import set_default_commands
+from utils.sender import broadcast
+from api.server import start_api
 
 # -------------------------------------------------------------------
 # Logging configuration
@@ -23,16 +25,33 @@ async def run_bot() -> None:
     Main entry point for running the Telegram bot.
     Initializes database, registers routers and starts polling.
     """
-    dispatcher = Dispatcher(storage=MemoryStorage())
+    dispatcher = Dispatcher(storage=storage)
 
     # ---------------- Database ----------------
     await db.connect()
     await db.create_tables()
+    await spool.start()
     logger.info("✅ Database connected and tables ensured.")
 
+    # ---------------- Geozones ----------------
+    if os.path.exists(config.geozones.path):
+        count = await asyncio.to_thread(geozones.load, config.geozones.path)
+        logger.info(f"🚫 Loaded {count} geozones from {config.geozones.path}")
+    else:
+        logger.info(f"ℹ️ No geozone file at {config.geozones.path}, route checks disabled.")
+
+    # ---------------- HTTP API ----------------
+    api_runner = None
+    if config.api.enabled:
+        api_runner = await start_api(db, config.api.host, config.api.port, geozones)
+
     # ---------------- Routers ----------------
     dispatcher.include_router(start.router)
     dispatcher.include_router(location.router)
+    dispatcher.include_router(survey.router)
+    dispatcher.include_router(matrix.router)
+    dispatcher.include_router(preview.router)
+    dispatcher.include_router(admin.router)
     dispatcher.include_router(help.router)
     dispatcher.include_router(about.router)
 
@@ -43,11 +62,7 @@ async def run_bot() -> None:
         await set_default_commands(bot)
 
         # Notify admins that bot is online
-        for admin_id in config.admin_ids:
-            try:
-                await bot.send_message(admin_id, "🤖 Bot has started successfully!")
-            except Exception:
-                logger.warning(f"Could not notify admin {admin_id}")
+        await broadcast(bot, config.admins.ids, "🤖 Bot has started successfully!")
 
         logger.info("🚀 Bot started successfully.")
         await dispatcher.start_polling(bot)
@@ -57,24 +72,22 @@ async def run_bot() -> None:
 
     except Exception as e:
         logger.exception(f"❌ Unexpected error: {e}")
-        for admin_id in config.admin_ids:
-            try:
-                await bot.send_message(admin_id, f"❌ Bot error:\n<code>{e}</code>")
-            except Exception:
-                pass
+        await broadcast(bot, config.admins.ids, f"❌ Bot error:\n<code>{e}</code>")
 
     finally:
         # ---------------- Shutdown ----------------
+        await broadcast(bot, config.admins.ids, "🛑 Bot has been stopped.")
+
+        if api_runner:
+            await api_runner.cleanup()
+        await spool.stop()
         await db.disconnect()
+        await sender.stop()
+        previewer.shutdown()
+        matrix_workers.shutdown()
         await bot.session.close()
         logger.info("🔌 Bot and database connections closed.")
 
-        for admin_id in config.admin_ids:
-            try:
-                await bot.send_message(admin_id, "🛑 Bot has been stopped.")
-            except Exception:
-                pass
-
 
 def main() -> None:
     """CLI entry point."""
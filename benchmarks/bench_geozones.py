@@ -0,0 +1,118 @@
+import argparse
+import time
+
+import numpy as np
+import shapely
+
+from utils.geozones import Geozone, GeozoneIndex
+
+# Area the synthetic zones and routes are spread over (degrees)
+LAT_RANGE = (40.0, 42.0)
+LON_RANGE = (68.0, 71.0)
+
+
+def random_zones(count: int, rng: np.random.Generator) -> list:
+    """Irregular 6..12-gons of roughly 100 m .. 2 km radius"""
+    zones = []
+    for i in range(count):
+        lat = rng.uniform(*LAT_RANGE)
+        lon = rng.uniform(*LON_RANGE)
+        sides = int(rng.integers(6, 13))
+        angles = np.sort(rng.uniform(0, 2 * np.pi, sides))
+        radius = rng.uniform(0.001, 0.02, sides)
+        ring = np.column_stack((lon + radius * np.cos(angles), lat + radius * np.sin(angles)))
+        zones.append(Geozone(
+            id=i,
+            name=f"Zone {i}",
+            polygon=shapely.Polygon(ring),
+            min_alt=int(rng.choice([0, 0, 150])),
+            max_alt=int(rng.choice([0, 120, 500])),
+            type="inclusive" if rng.random() < 0.1 else "exclusive",
+        ))
+    return zones
+
+
+def random_route(segments: int, rng: np.random.Generator) -> list:
+    """Straight track with altitudes climbing and descending through the zone limits"""
+    a = np.array([rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)])
+    b = np.array([rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)])
+    t = np.linspace(0, 1, segments + 1)[:, None]
+    track = a + (b - a) * t
+    altitudes = rng.integers(20, 600, len(track))
+    return [(lat, lon, int(alt)) for (lat, lon), alt in zip(track.tolist(), altitudes)]
+
+
+def brute_force(zones: list, points: list) -> set:
+    """
+    Reference: every segment against every zone, no index, with the
+    same exclusive-type and altitude-overlap rule as ``check_route``.
+
+    :return: set of (segment, zone id)
+    """
+    array = np.asarray(points, dtype=np.float64)
+    coords = array[:, [1, 0]]
+    segments = shapely.linestrings(np.stack((coords[:-1], coords[1:]), axis=1))
+    polygons = np.array([z.polygon for z in zones])
+    hits = shapely.intersects(segments[:, None], polygons[None, :])
+
+    alt = array[:, 2]
+    low = np.minimum(alt[:-1], alt[1:])[:, None]
+    high = np.maximum(alt[:-1], alt[1:])[:, None]
+    min_alt = np.array([z.min_alt for z in zones], dtype=np.float64)[None, :]
+    max_alt = np.array([z.max_alt or np.inf for z in zones], dtype=np.float64)[None, :]
+    exclusive = np.array([z.type == "exclusive" for z in zones])[None, :]
+    hits &= exclusive & (high >= min_alt) & (low <= max_alt)
+
+    seg_idx, zone_idx = np.nonzero(hits)
+    return {(int(s), zones[int(z)].id) for s, z in zip(seg_idx, zone_idx)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geozone STR-tree benchmark")
+    parser.add_argument("--zones", type=int, default=10_000)
+    parser.add_argument("--segments", type=int, default=1_000)
+    parser.add_argument("--routes", type=int, default=50)
+    parser.add_argument(
+        "--verify", type=int, default=3,
+        help="routes checked against the unindexed brute force (0 = skip)",
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    zones = random_zones(args.zones, rng)
+    routes = [random_route(args.segments, rng) for _ in range(args.routes)]
+
+    index = GeozoneIndex()
+    started = time.perf_counter()
+    index.build(zones)
+    build_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    conflicts = sum(len(index.check_route(points)) for points in routes)
+    check_s = time.perf_counter() - started
+
+    print(f"Zones: {args.zones}, routes: {args.routes} x {args.segments} segments")
+    print(f"STR-tree build:  {build_s * 1000:9.1f} ms")
+    print(f"Route check:     {check_s / args.routes * 1000:9.2f} ms/route "
+          f"({args.routes * args.segments / check_s:,.0f} segments/s)")
+    print(f"Conflicts found: {conflicts}")
+
+    verify = routes[:args.verify]
+    if verify:
+        brute_s = 0.0
+        for points in verify:
+            started = time.perf_counter()
+            expected = brute_force(zones, points)
+            brute_s += time.perf_counter() - started
+
+            found = {(c.segment, c.zone.id) for c in index.check_route(points)}
+            assert found == expected, (
+                f"index and brute force differ: {len(found - expected)} extra, "
+                f"{len(expected - found)} missing"
+            )
+        print(f"Brute force:     {brute_s / len(verify) * 1000:9.2f} ms/route "
+              f"(same (segment, zone) pairs on {len(verify)} routes)")
+
+
+if __name__ == "__main__":
+    main()
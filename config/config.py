@@ -21,11 +21,38 @@ class AdminConfig:
     ids: list[int]
 
 
+@dataclass
+class FsmConfig:
+    max_entries: int = 10_000
+    ttl: float = 3600.0
+
+
+@dataclass
+class SpoolConfig:
+    path: str = "spool/records.journal"
+
+
+@dataclass
+class ApiConfig:
+    enabled: bool = False
+    host: str = "0.0.0.0"
+    port: int = 8080
+
+
+@dataclass
+class GeozoneConfig:
+    path: str = "data/geozones.geojson"
+
+
 @dataclass
 class Config:
     tg_bot: TelegramBotConfig
     database: DatabaseConfig
     admins: AdminConfig
+    fsm: FsmConfig
+    spool: SpoolConfig
+    api: ApiConfig
+    geozones: GeozoneConfig
     parse_mode: ParseMode = ParseMode.HTML
 
 
@@ -46,5 +73,20 @@ def load_config() -> Config:
         admins=AdminConfig(
             ids=admin_ids
         ),
+        fsm=FsmConfig(
+            max_entries=int(os.getenv("FSM_MAX_ENTRIES", "10000")),
+            ttl=float(os.getenv("FSM_TTL", "3600"))
+        ),
+        spool=SpoolConfig(
+            path=os.getenv("SPOOL_PATH", "spool/records.journal")
+        ),
+        api=ApiConfig(
+            enabled=os.getenv("API_ENABLED", "").lower() in ("1", "true", "yes"),
+            host=os.getenv("API_HOST", "0.0.0.0"),
+            port=int(os.getenv("API_PORT", "8080"))
+        ),
+        geozones=GeozoneConfig(
+            path=os.getenv("GEOZONES_PATH", "data/geozones.geojson")
+        ),
         parse_mode=ParseMode.HTML
     )
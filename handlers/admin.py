@@ -0,0 +1,185 @@
+import asyncio
+import html
+import logging
+import time
+
+from aiogram import Router, types
+from aiogram.filters import Command, CommandObject
+from aiogram.types import BufferedInputFile
+
+from my_loaders import db, storage, mission_cache, sender
+from api.server import generate_api_key, hash_api_key
+from utils.filters import IsAdmin
+from utils.profiler import SamplingProfiler
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+STATS_CACHE_TTL = 30.0
+
+_stats_cache = {"text": None, "expires": 0.0}
+
+PROFILE_DEFAULT_SECONDS = 10
+PROFILE_MAX_SECONDS = 120
+
+_active_profiler = {"profiler": None}
+
+
+async def build_stats_text() -> str:
+    """Collect statistics from counter tables and in-process caches"""
+    users = await db.get_users_count()
+    calculations = await db.get_calculations_count()
+    daily = await db.get_daily_calculations(days=7)
+    top = await db.get_top_users(limit=5)
+    saved = await db.get_mission_upload_savings()
+    fsm = storage.stats()
+    outbound = sender.stats()
+
+    text = (
+        "📊 <b>Bot statistics</b>\n"
+        "────────────────────────────\n"
+        f"👥 Users: <code>{users}</code>\n"
+        f"🧮 Calculations: <code>{calculations}</code>\n\n"
+        "📅 <b>Last 7 days:</b>\n"
+    )
+    if daily:
+        for row in daily:
+            text += f"• {row['day']:%Y-%m-%d}: <code>{row['count']}</code>\n"
+    else:
+        text += "• no calculations\n"
+
+    text += "\n🏆 <b>Top users:</b>\n"
+    for idx, row in enumerate(top, start=1):
+        name = html.escape(row["full_name"] or "Unknown")
+        text += f"{idx}. {name} (<code>{row['user_id']}</code>) — {row['count']}\n"
+
+    text += (
+        "\n────────────────────────────\n"
+        f"📂 Upload bytes saved by file_id reuse: <code>{saved}</code> "
+        f"(this run: <code>{mission_cache.bytes_saved}</code>)\n"
+        f"🧠 FSM entries: <code>{fsm['size']}/{fsm['max_entries']}</code> | "
+        f"evicted: <code>{fsm['evicted_ttl']}</code> idle, "
+        f"<code>{fsm['evicted_capacity']}</code> capacity\n"
+        f"📤 Sends: <code>{outbound['sent']}</code> | "
+        f"coalesced: <code>{outbound['coalesced']}</code> | "
+        f"retries: <code>{outbound['retries']}</code> | "
+        f"failed: <code>{outbound['failed']}</code> | "
+        f"queued: <code>{outbound['queued']}</code>\n"
+        f"⏱ Queue latency p50/p95/max: <code>{outbound['latency_p50']:.2f}/"
+        f"{outbound['latency_p95']:.2f}/{outbound['latency_max']:.2f} s</code>"
+    )
+    return text
+
+
+@router.message(Command("stats"), IsAdmin())
+async def stats_command(message: types.Message):
+    """
+    Admin statistics. Result is cached for a short TTL so repeated
+    calls do not touch the database.
+    """
+    try:
+        now = time.monotonic()
+        if _stats_cache["text"] is None or now >= _stats_cache["expires"]:
+            _stats_cache["text"] = await build_stats_text()
+            _stats_cache["expires"] = now + STATS_CACHE_TTL
+
+        await message.answer(_stats_cache["text"], parse_mode="HTML")
+
+    except Exception as e:
+        logger.exception(f"❌ Error in /stats command: {e}")
+        await message.answer("⚠️ Failed to load statistics.")
+
+
+def build_profile_text(profiler: SamplingProfiler) -> str:
+    """Summarize top functions and per-handler attribution"""
+    samples = max(profiler.samples, 1)
+
+    text = (
+        "🔥 <b>Profile finished</b>\n"
+        f"⏱ {profiler.duration:.1f} s | {profiler.samples} samples\n\n"
+        "📂 <b>Handlers:</b>\n"
+    )
+    for handler, count in list(profiler.handler_breakdown().items())[:10]:
+        text += f"• <code>{html.escape(handler)}</code> — {count * 100 / samples:.1f}%\n"
+
+    text += "\n🔝 <b>Top functions (self / total):</b>\n"
+    for name, own, total in profiler.top_functions(limit=10):
+        text += (
+            f"• <code>{html.escape(name[:80])}</code> — "
+            f"{own * 100 / samples:.1f}% / {total * 100 / samples:.1f}%\n"
+        )
+    return text
+
+
+@router.message(Command("profile"), IsAdmin())
+async def profile_command(message: types.Message, command: CommandObject):
+    """
+    Sample the running bot for N seconds and send back a collapsed-stack
+    file (flamegraph input) with top functions and handler breakdown.
+    """
+    if _active_profiler["profiler"] is not None:
+        await message.answer("⚠️ A profiling session is already running.")
+        return
+
+    try:
+        seconds = int(command.args) if command.args else PROFILE_DEFAULT_SECONDS
+    except ValueError:
+        await message.answer("⚠️ Usage: <code>/profile 30</code>", parse_mode="HTML")
+        return
+    seconds = max(1, min(seconds, PROFILE_MAX_SECONDS))
+
+    profiler = SamplingProfiler()
+    _active_profiler["profiler"] = profiler
+    try:
+        await message.answer(f"🔬 Profiling for {seconds} s...")
+        profiler.start()
+        await asyncio.sleep(seconds)
+        profiler.stop()
+
+        collapsed = await asyncio.to_thread(profiler.collapsed)
+        await message.answer(build_profile_text(profiler), parse_mode="HTML")
+        await message.answer_document(
+            BufferedInputFile(collapsed.encode("utf-8"), filename="profile.collapsed.txt"),
+            caption="🔥 Collapsed stacks (flamegraph.pl / speedscope)",
+        )
+
+    except Exception as e:
+        logger.exception(f"❌ Error in /profile command: {e}")
+        await message.answer("⚠️ Profiling failed.")
+    finally:
+        if profiler.running:
+            profiler.stop()
+        _active_profiler["profiler"] = None
+
+
+@router.message(Command("apikey"), IsAdmin())
+async def apikey_command(message: types.Message, command: CommandObject):
+    """
+    Create (``/apikey <name>``) or revoke (``/apikey revoke <name>``)
+    HTTP API keys. Only the key hash is stored.
+    """
+    args = (command.args or "").split()
+    try:
+        if len(args) == 2 and args[0] == "revoke":
+            revoked = await db.revoke_api_key(args[1])
+            await message.answer("🔒 Key revoked." if revoked else "⚠️ No active key with that name.")
+            return
+
+        if len(args) != 1:
+            await message.answer(
+                "Usage: <code>/apikey name</code> or <code>/apikey revoke name</code>",
+                parse_mode="HTML",
+            )
+            return
+
+        key = generate_api_key()
+        await db.add_api_key(hash_api_key(key), args[0], created_by=message.from_user.id)
+        await message.answer(
+            f"🔑 API key for <b>{html.escape(args[0])}</b>:\n<code>{key}</code>\n\n"
+            "Send it in the <code>X-API-Key</code> header. It is shown only once.",
+            parse_mode="HTML",
+        )
+
+    except Exception as e:
+        logger.exception(f"❌ Error in /apikey command: {e}")
+        await message.answer("⚠️ Failed to manage API key.")
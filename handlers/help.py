@@ -23,6 +23,8 @@ async def help_command(message: types.Message):
             "📘 <b>Available commands:</b>\n"
             "• /start — Start the bot and open the main menu\n"
             "• /coordinate — Start coordinate calculation 🧭\n"
+            "• /survey — Generate area survey (lawnmower) mission 🗺\n"
+            "• /matrix — Pairwise distance matrix as CSV / NPY 📊\n"
             "• /history — View your recent calculations 📜\n"
             "• /about — Information about the bot ℹ️\n"
             "• /help — Open this help window ❓\n\n"
@@ -1,21 +1,24 @@
+import asyncio
 import logging
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
 
 from aiogram import Router, types, F
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
-from aiogram.types import FSInputFile
 
-from geopy.distance import geodesic
-
-from my_loaders import db
+from my_loaders import db, mission_cache, spool, previewer, geozones
 from states.statesm import GeoStates
+from utils.geozones import conflict_warning, mission_geozones
+from utils.mission import build_mission_xml, route_key
+from utils.route import MAX_ALTITUDE, MAX_SEGMENTS, MIN_ALTITUDE, compute_route, validate_altitude
+from utils.survey import chunk_waypoints
+from utils.waypoint_codec import decode_waypoints, encode_waypoints
 from keyboards.keyboardm import (
     segments_kb,
     altitude_kb,
     cancel_kb,
     main_menu,
+    preview_kb,
+    redownload_kb,
 )
 
 router = Router()
@@ -113,6 +116,8 @@ async def get_second_coordinate(message: types.Message, state: FSMContext):
 async def get_segments_count(message: types.Message, state: FSMContext):
     try:
         segments = int(message.text)
+        if not 1 <= segments <= MAX_SEGMENTS:
+            raise ValueError
         await state.update_data(segments=segments)
 
         await message.answer(
@@ -134,7 +139,9 @@ async def get_segments_count(message: types.Message, state: FSMContext):
 async def process_altitude_and_calculation(message: types.Message, state: FSMContext):
     try:
         text = message.text.replace(" ", "")
-        altitude_values = list(map(int, text.split(",")))
+        # Range is checked here, before any output, so the packed
+        # waypoints stored with the calculation always fit
+        altitude_values = [validate_altitude(int(v)) for v in text.split(",")]
 
         if len(altitude_values) not in (1, 3):
             raise ValueError
@@ -143,26 +150,10 @@ async def process_altitude_and_calculation(message: types.Message, state: FSMCon
         point_a, point_b = data["coord_a"], data["coord_b"]
         segments = data["segments"]
 
-        # Generate intermediate points
-        points = []
-        for i in range(segments + 1):
-            fraction = i / segments
-            lat = point_a[0] + (point_b[0] - point_a[0]) * fraction
-            lon = point_a[1] + (point_b[1] - point_a[1]) * fraction
-            alt = altitude_values[i % len(altitude_values)]
-            points.append((lat, lon, alt))
-
-        total_distance_km = geodesic(point_a, point_b).kilometers
-        avg_segment_km = total_distance_km / segments
-
-        # Calculate distances between points
-        distances = []
-        for i in range(len(points) - 1):
-            d = geodesic(
-                (points[i][0], points[i][1]),
-                (points[i + 1][0], points[i + 1][1]),
-            ).meters
-            distances.append(d)
+        route = compute_route(point_a, point_b, segments, altitude_values)
+        points, distances = route.points, route.distances
+        total_distance_km = route.total_km
+        avg_segment_km = route.avg_segment_km
 
         # Send points info
         message_text = ""
@@ -178,62 +169,33 @@ async def process_altitude_and_calculation(message: types.Message, state: FSMCon
                     f"🛬 {alt} m | 🔚 Final point\n\n"
                 )
 
-        while len(message_text) > 3900:
-            await message.answer(message_text[:3900], parse_mode="HTML")
-            message_text = message_text[3900:]
-
-        if message_text:
-            await message.answer(message_text, parse_mode="HTML")
+        # Queue all chunks at once; the outbound scheduler paces them
+        chunks = [
+            message_text[i:i + 3900]
+            for i in range(0, len(message_text), 3900)
+        ]
+        await asyncio.gather(
+            *(message.answer(chunk, parse_mode="HTML") for chunk in chunks)
+        )
 
         # =========================
         # CREATE INAV MISSION FILE
         # =========================
-        mission = ET.Element("mission")
-        ET.SubElement(mission, "version", {"value": "2.3-pre8"})
-        ET.SubElement(
-            mission,
-            "mwp",
-            {
-                "cx": str(points[0][1]),
-                "cy": str(points[0][0]),
-                "home-x": "0",
-                "home-y": "0",
-                "zoom": "13",
-            },
-        )
-        ET.SubElement(mission, "geozones", {"count": "0"})
-
-        for i, (lat, lon, alt) in enumerate(points, start=1):
-            ET.SubElement(
-                mission,
-                "missionitem",
-                {
-                    "no": str(i),
-                    "action": "WAYPOINT",
-                    "lat": f"{lat:.7f}",
-                    "lon": f"{lon:.7f}",
-                    "alt": str(alt),
-                    "parameter1": "0",
-                    "parameter2": "0",
-                    "parameter3": "0",
-                    "flag": "165" if i == len(points) else "0",
-                },
-            )
-
-        xml_string = minidom.parseString(ET.tostring(mission)).toprettyxml(indent="\t")
-        file_path = f"INAV_{message.from_user.id}.mission"
+        conflicts = geozones.check_route(points)
+        zones, skipped = mission_geozones(conflicts)
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n')
-            f.write(xml_string)
+        mission_xml = build_mission_xml(points, geozones=zones)
+        key = route_key(mission_xml)
+        previewer.remember(key, points)
 
         # Save calculation to database
-        await db.add_calculation(
+        await spool.add_calculation(
             user_id=message.from_user.id,
             coord_a=str(point_a),
             coord_b=str(point_b),
             segments=segments,
             result=f"{total_distance_km:.3f} km | Altitudes: {altitude_values}",
+            waypoints=encode_waypoints(points),
         )
 
         # Final summary
@@ -243,10 +205,15 @@ async def process_altitude_and_calculation(message: types.Message, state: FSMCon
             f"📍 Average segment: <code>{avg_segment_km * 1000:.1f} m</code>\n"
             "📂 INAV mission file generated.",
             parse_mode="HTML",
+            reply_markup=preview_kb(key),
         )
 
-        await message.answer_document(
-            FSInputFile(file_path),
+        if conflicts:
+            await message.answer(conflict_warning(conflicts, skipped), parse_mode="HTML")
+
+        await mission_cache.send_mission(
+            message,
+            mission_xml,
             caption="✈️ INAV 7.0.1 mission file ready!",
             reply_markup=main_menu,
         )
@@ -257,7 +224,8 @@ async def process_altitude_and_calculation(message: types.Message, state: FSMCon
         logger.exception(e)
         await message.answer(
             "⚠️ Invalid altitude input.\n"
-            "Examples: <b>50</b> or <b>50,60,70</b>",
+            "Examples: <b>50</b> or <b>50,60,70</b>\n"
+            f"Range: {MIN_ALTITUDE} to {MAX_ALTITUDE} m",
             parse_mode="HTML",
         )
 
@@ -278,17 +246,58 @@ async def show_history(message: types.Message):
             )
             return
 
-        await message.answer(
-            "📜 <b>Your last 3 calculations:</b>",
-            parse_mode="HTML",
+        # Queued together so the scheduler can coalesce them
+        await asyncio.gather(
+            message.answer(
+                "📜 <b>Your last 3 calculations:</b>",
+                parse_mode="HTML",
+            ),
+            *(
+                message.answer(
+                    f"📍 <b>Result {idx}:</b> <code>{row['result']}</code>",
+                    parse_mode="HTML",
+                    reply_markup=redownload_kb(row["id"]) if row["has_waypoints"] else None,
+                )
+                for idx, row in enumerate(rows, start=1)
+            ),
         )
 
-        for idx, row in enumerate(rows, start=1):
-            await message.answer(
-                f"📍 <b>Result {idx}:</b> <code>{row['result']}</code>",
-                parse_mode="HTML",
+    except Exception as e:
+        logger.exception(e)
+        await message.answer("⚠️ Failed to load history.")
+
+
+# =========================
+# MISSION RE-DOWNLOAD
+# =========================
+@router.callback_query(F.data.startswith("redownload:"))
+async def redownload_mission(call: types.CallbackQuery):
+    """
+    Rebuilds mission file(s) from stored packed waypoints,
+    without any geodesic calculation.
+    """
+    try:
+        calculation_id = int(call.data.split(":", 1)[1])
+        blob = await db.get_calculation_waypoints(calculation_id, call.from_user.id)
+
+        if not blob:
+            await call.answer("⚠️ Mission data is not available for this calculation.", show_alert=True)
+            return
+
+        await call.answer()
+        points, split = decode_waypoints(blob)
+        missions = chunk_waypoints(points) if split else [points]
+
+        # Zones are re-checked: the geozone file may have changed since
+        for idx, mission_points in enumerate(missions, start=1):
+            zones, _ = mission_geozones(geozones.check_route(mission_points))
+            await mission_cache.send_mission(
+                call.message,
+                build_mission_xml(mission_points, geozones=zones),
+                caption=f"♻️ Mission re-downloaded ({idx}/{len(missions)})",
+                reply_markup=main_menu if idx == len(missions) else None,
             )
 
     except Exception as e:
         logger.exception(e)
-        await message.answer("⚠️ Failed to load history.")
+        await call.message.answer("⚠️ Failed to rebuild mission file.")
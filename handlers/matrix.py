@@ -0,0 +1,157 @@
+import logging
+import os
+import tempfile
+
+from aiogram import Router, types, F
+from aiogram.filters import Command
+from aiogram.fsm.context import FSMContext
+from aiogram.types import FSInputFile
+
+from my_loaders import bot, matrix_workers
+from states.statesm import MatrixStates
+from utils.distance_matrix import write_csv, write_npy
+from utils.route import validate_coordinate
+from keyboards.keyboardm import matrix_format_kb, cancel_kb, main_menu
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+MAX_MATRIX_POINTS = 3000
+MAX_POINTS_FILE_SIZE = 2 * 1024 * 1024
+
+# Telegram bot API upload limit
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+
+# Below this size the matrix is computed in-process
+PROCESS_POOL_THRESHOLD = 500
+
+# extension, writer, max points. CSV takes ~8 bytes per cell, so
+# 3000 points would be ~72 MB; NPY is 4 bytes per cell (36 MB).
+FORMATS = {
+    "📄 CSV": ("csv", write_csv, 1500),
+    "📦 NPY": ("npy", write_npy, MAX_MATRIX_POINTS),
+}
+
+
+def parse_points(text: str) -> list[tuple[float, float]]:
+    """
+    Parse ``lat, lon`` pairs, one per line (``;`` also separates).
+
+    :raises ValueError: malformed or out-of-range coordinate
+    """
+    points = []
+    for line in text.replace(";", "\n").splitlines():
+        if not line.strip():
+            continue
+        points.append(validate_coordinate(line.split(",")[:2]))
+    return points
+
+
+def build_matrix_file(points, extension: str, writer, **kwargs) -> str:
+    """Write matrix to a temporary file block by block and return its path"""
+    with tempfile.NamedTemporaryFile(suffix=f".{extension}", delete=False) as f:
+        writer(f, points, **kwargs)
+        return f.name
+
+
+# =========================
+# START MATRIX FLOW
+# =========================
+@router.message(Command("matrix"))
+async def ask_format(message: types.Message, state: FSMContext):
+    """
+    Starts distance matrix flow.
+    """
+    await message.answer(
+        "📊 Choose the <b>output format</b>:\n"
+        "• CSV — readable table in meters\n"
+        "• NPY — compact NumPy float32 array",
+        parse_mode="HTML",
+        reply_markup=matrix_format_kb,
+    )
+    await state.set_state(MatrixStates.format)
+
+
+# =========================
+# OUTPUT FORMAT
+# =========================
+@router.message(MatrixStates.format, F.text.in_(FORMATS))
+async def get_format(message: types.Message, state: FSMContext):
+    await state.update_data(format=message.text)
+    _, _, max_points = FORMATS[message.text]
+    await message.answer(
+        "📍 Send the points, one per line:\n"
+        "<code>latitude, longitude</code>\n"
+        f"or upload them as a .txt / .csv file (up to {max_points} points).",
+        parse_mode="HTML",
+        reply_markup=cancel_kb,
+    )
+    await state.set_state(MatrixStates.points)
+
+
+@router.message(MatrixStates.format)
+async def wrong_format(message: types.Message):
+    await message.answer("⚠️ Please choose a format from the keyboard.")
+
+
+# =========================
+# POINTS & CALCULATION
+# =========================
+@router.message(MatrixStates.points)
+async def process_matrix(message: types.Message, state: FSMContext):
+    data = await state.get_data()
+    extension, writer, max_points = FORMATS[data["format"]]
+
+    try:
+        if message.document:
+            if (message.document.file_size or 0) > MAX_POINTS_FILE_SIZE:
+                await message.answer("⚠️ File is too large.")
+                return
+            buffer = await bot.download(message.document)
+            text = buffer.read().decode("utf-8")
+        else:
+            text = message.text or ""
+
+        points = parse_points(text)
+        if len(points) < 2 or len(points) > max_points:
+            raise ValueError
+    except Exception:
+        await message.answer(
+            f"⚠️ Send between 2 and {max_points} points in format: "
+            "<b>41.311081, 69.240562</b>\n"
+            "(latitude −90…90, longitude −180…180)",
+            parse_mode="HTML",
+        )
+        return
+
+    await state.clear()
+
+    file_path = None
+    try:
+        await message.answer(f"⏳ Calculating {len(points)}×{len(points)} matrix...")
+
+        file_path = await matrix_workers.run(
+            build_matrix_file, points, extension, writer,
+            parallel=len(points) >= PROCESS_POOL_THRESHOLD,
+        )
+
+        size = os.path.getsize(file_path)
+        if size > MAX_UPLOAD_SIZE:
+            await message.answer(
+                f"⚠️ Matrix file is {size / 1024 / 1024:.0f} MB, over Telegram's "
+                f"{MAX_UPLOAD_SIZE // 1024 // 1024} MB limit. Please send fewer points.",
+                reply_markup=main_menu,
+            )
+            return
+
+        await message.answer_document(
+            FSInputFile(file_path, filename=f"distance_matrix.{extension}"),
+            caption=f"📊 Distance matrix ({len(points)} points, meters)",
+            reply_markup=main_menu,
+        )
+    except Exception as e:
+        logger.exception(e)
+        await message.answer("⚠️ Failed to calculate distance matrix.", reply_markup=main_menu)
+    finally:
+        if file_path:
+            os.remove(file_path)
@@ -0,0 +1,42 @@
+import logging
+
+from aiogram import Router, types, F
+
+from my_loaders import mission_cache, previewer
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+EXPIRED_TEXT = "⌛ Preview expired. Please recalculate the route."
+
+
+@router.callback_query(F.data.startswith("preview:"))
+async def send_route_preview(call: types.CallbackQuery):
+    """
+    Sends PNG preview of a calculated route. Rendered once per route
+    key in the worker pool; repeats are re-sent by cached file_id.
+    """
+    key = call.data.split(":", 1)[1]
+    points = previewer.get(key)
+
+    try:
+        if points is None and await mission_cache.get_photo_file_id(key) is None:
+            await call.answer(EXPIRED_TEXT, show_alert=True)
+            return
+
+        await call.answer("🖼 Rendering preview...")
+        sent = await mission_cache.send_photo(
+            call.message,
+            key,
+            # Route evicted: only a cached file_id can be used
+            render=(lambda: previewer.render(points)) if points is not None else None,
+            filename=f"route_{key[:12]}.png",
+            caption="🖼 Route preview: track (local meters) and altitude profile",
+        )
+        if sent is None:
+            # Cached file_id was rejected and the route is gone
+            await call.message.answer(EXPIRED_TEXT)
+
+    except Exception as e:
+        logger.exception(e)
+        await call.message.answer("⚠️ Failed to render route preview.")
@@ -2,8 +2,9 @@ import logging
 from aiogram import Router, types
 from aiogram.filters import Command
 
-from my_loaders import db, bot, config
+from my_loaders import bot, config, spool
 from keyboards.keyboardm import main_menu
+from utils.sender import broadcast
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -16,7 +17,7 @@ async def start_cmd(message: types.Message):
     """Start command — registers user and shows main menu."""
     try:
         # Save user
-        await db.add_user(
+        await spool.add_user(
             telegram_id=message.from_user.id,
             full_name=message.from_user.full_name,
             username=message.from_user.username
@@ -27,20 +28,17 @@ async def start_cmd(message: types.Message):
         )
 
         # Notify admins
-        for admin_id in ADMIN_IDS:
-            try:
-                await bot.send_message(
-                    admin_id,
-                    (
-                        "🆕 <b>New user joined</b>\n\n"
-                        f"👤 <b>Name:</b> {message.from_user.full_name}\n"
-                        f"🔗 <b>Username:</b> @{message.from_user.username or 'N/A'}\n"
-                        f"🆔 <b>ID:</b> <code>{message.from_user.id}</code>"
-                    ),
-                    parse_mode="HTML"
-                )
-            except Exception as e:
-                logger.warning(f"Failed to notify admin {admin_id}: {e}")
+        await broadcast(
+            bot,
+            ADMIN_IDS,
+            (
+                "🆕 <b>New user joined</b>\n\n"
+                f"👤 <b>Name:</b> {message.from_user.full_name}\n"
+                f"🔗 <b>Username:</b> @{message.from_user.username or 'N/A'}\n"
+                f"🆔 <b>ID:</b> <code>{message.from_user.id}</code>"
+            ),
+            parse_mode="HTML"
+        )
 
         # Reply to user
         await message.answer(
@@ -62,17 +60,14 @@ async def start_cmd(message: types.Message):
         )
 
         # Notify admins about error
-        for admin_id in ADMIN_IDS:
-            try:
-                await bot.send_message(
-                    admin_id,
-                    (
-                        "❌ <b>Bot error (start command)</b>\n\n"
-                        f"👤 User: {message.from_user.full_name}\n"
-                        f"🆔 <code>{message.from_user.id}</code>\n"
-                        f"📝 Error:\n<code>{e}</code>"
-                    ),
-                    parse_mode="HTML"
-                )
-            except Exception:
-                pass
+        await broadcast(
+            bot,
+            ADMIN_IDS,
+            (
+                "❌ <b>Bot error (start command)</b>\n\n"
+                f"👤 User: {message.from_user.full_name}\n"
+                f"🆔 <code>{message.from_user.id}</code>\n"
+                f"📝 Error:\n<code>{e}</code>"
+            ),
+            parse_mode="HTML"
+        )
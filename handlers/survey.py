@@ -0,0 +1,222 @@
+import logging
+
+from aiogram import Router, types
+from aiogram.filters import Command
+from aiogram.fsm.context import FSMContext
+
+from my_loaders import mission_cache, spool, previewer, geozones
+from states.statesm import SurveyStates
+from utils.geozones import conflict_warning, mission_geozones
+from utils.mission import build_mission_xml, route_key
+from utils.route import MAX_ALTITUDE, MIN_ALTITUDE, validate_altitude, validate_coordinate
+from utils.waypoint_codec import encode_waypoints
+from utils.survey import (
+    MAX_MISSION_WAYPOINTS,
+    MAX_SURVEY_WAYPOINTS,
+    SurveyTooLarge,
+    generate_survey,
+    split_missions,
+    track_length_m,
+)
+from keyboards.keyboardm import (
+    spacing_kb,
+    heading_kb,
+    altitude_kb,
+    cancel_kb,
+    main_menu,
+    preview_kb,
+)
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+MIN_SPACING_M = 5.0
+
+
+# =========================
+# START SURVEY FLOW
+# =========================
+@router.message(Command("survey"))
+async def ask_polygon(message: types.Message, state: FSMContext):
+    """
+    Starts area survey (lawnmower) flow.
+    """
+    await message.answer(
+        "🗺 Send the <b>survey polygon</b> vertices, one per line:\n"
+        "<code>latitude, longitude</code>\n"
+        "Example:\n"
+        "<code>41.300000, 69.200000\n"
+        "41.310000, 69.200000\n"
+        "41.310000, 69.220000\n"
+        "41.300000, 69.220000</code>",
+        parse_mode="HTML",
+        reply_markup=cancel_kb,
+    )
+    await state.set_state(SurveyStates.polygon)
+
+
+# =========================
+# POLYGON
+# =========================
+@router.message(SurveyStates.polygon)
+async def get_polygon(message: types.Message, state: FSMContext):
+    try:
+        polygon = []
+        for line in message.text.replace(";", "\n").splitlines():
+            if not line.strip():
+                continue
+            polygon.append(validate_coordinate(line.split(",")))
+
+        if len(polygon) < 3:
+            raise ValueError
+
+        await state.update_data(polygon=polygon)
+        await message.answer(
+            "↔️ Choose or enter <b>line spacing</b> (meters):",
+            parse_mode="HTML",
+            reply_markup=spacing_kb,
+        )
+        await state.set_state(SurveyStates.spacing)
+    except Exception:
+        await message.answer(
+            "⚠️ Invalid polygon!\n"
+            "Send at least 3 lines in format: <b>41.311081, 69.240562</b>\n"
+            "(latitude −90…90, longitude −180…180)",
+            parse_mode="HTML",
+        )
+
+
+# =========================
+# LINE SPACING
+# =========================
+@router.message(SurveyStates.spacing)
+async def get_spacing(message: types.Message, state: FSMContext):
+    try:
+        spacing = float(message.text)
+        if spacing < MIN_SPACING_M:
+            raise ValueError
+        await state.update_data(spacing=spacing)
+
+        await message.answer(
+            "🧭 Choose or enter <b>sweep heading</b> (degrees, 0 = north):",
+            parse_mode="HTML",
+            reply_markup=heading_kb,
+        )
+        await state.set_state(SurveyStates.heading)
+    except ValueError:
+        await message.answer(f"⚠️ Please enter a spacing of at least {MIN_SPACING_M:g} meters.")
+
+
+# =========================
+# HEADING
+# =========================
+@router.message(SurveyStates.heading)
+async def get_heading(message: types.Message, state: FSMContext):
+    try:
+        heading = float(message.text) % 360
+        await state.update_data(heading=heading)
+
+        await message.answer(
+            "🛫 Choose or enter altitude (meters):",
+            reply_markup=altitude_kb,
+        )
+        await state.set_state(SurveyStates.altitude)
+    except ValueError:
+        await message.answer("⚠️ Please enter a valid number.")
+
+
+# =========================
+# ALTITUDE & GENERATION
+# =========================
+@router.message(SurveyStates.altitude)
+async def process_survey(message: types.Message, state: FSMContext):
+    try:
+        altitude = validate_altitude(int(message.text))
+    except ValueError:
+        await message.answer(
+            f"⚠️ Please enter an altitude from {MIN_ALTITUDE} to {MAX_ALTITUDE} meters."
+        )
+        return
+
+    data = await state.get_data()
+    polygon = data["polygon"]
+
+    try:
+        track = generate_survey(polygon, data["spacing"], data["heading"])
+    except SurveyTooLarge as e:
+        await message.answer(
+            f"⚠️ {e}. Please increase line spacing.",
+            reply_markup=spacing_kb,
+        )
+        await state.set_state(SurveyStates.spacing)
+        return
+    except ValueError as e:
+        await message.answer(f"⚠️ {e}.", reply_markup=main_menu)
+        await state.clear()
+        return
+
+    if len(track) > MAX_SURVEY_WAYPOINTS:
+        await message.answer(
+            f"⚠️ Survey needs {len(track)} waypoints "
+            f"(limit {MAX_SURVEY_WAYPOINTS}). Please increase line spacing.",
+            reply_markup=spacing_kb,
+        )
+        await state.set_state(SurveyStates.spacing)
+        return
+
+    try:
+        total_km = track_length_m(track) / 1000
+        missions = split_missions(track, altitude)
+        waypoints = [(lat, lon, altitude) for lat, lon in track.tolist()]
+
+        # One batch check for the whole track (warning), then per mission
+        # so every file carries only the zones its own legs cross
+        conflicts = geozones.check_route(waypoints)
+        mission_xmls = []
+        skipped = 0
+        for points in missions:
+            zones, dropped = mission_geozones(geozones.check_route(points) if conflicts else [])
+            skipped += dropped
+            mission_xmls.append(build_mission_xml(points, geozones=zones))
+
+        key = route_key(*mission_xmls)
+        previewer.remember(key, waypoints)
+
+        await spool.add_calculation(
+            user_id=message.from_user.id,
+            coord_a=str(polygon[0]),
+            coord_b=str(polygon[-1]),
+            segments=len(track) - 1,
+            result=(
+                f"Survey {total_km:.3f} km | {len(track)} waypoints | "
+                f"{len(missions)} missions | Altitude: {altitude}"
+            ),
+            waypoints=encode_waypoints(waypoints, split_missions=True),
+        )
+
+        await message.answer(
+            "✅ <b>Survey generated!</b>\n"
+            f"📏 Track length: <code>{total_km:.3f} km</code>\n"
+            f"📍 Waypoints: <code>{len(track)}</code>\n"
+            f"📂 Mission files: <code>{len(missions)}</code> "
+            f"(max {MAX_MISSION_WAYPOINTS} waypoints each)",
+            parse_mode="HTML",
+            reply_markup=preview_kb(key),
+        )
+
+        if conflicts:
+            await message.answer(conflict_warning(conflicts, skipped), parse_mode="HTML")
+
+        for idx, mission_xml in enumerate(mission_xmls, start=1):
+            await mission_cache.send_mission(
+                message,
+                mission_xml,
+                caption=f"✈️ Survey mission {idx}/{len(mission_xmls)}",
+                reply_markup=main_menu if idx == len(mission_xmls) else None,
+            )
+
+        await state.clear()
+
+    except Exception as e:
+        logger.exception(e)
+        await message.answer("⚠️ Failed to generate survey mission.")
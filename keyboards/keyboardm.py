@@ -1,4 +1,9 @@
-from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
+from aiogram.types import (
+    ReplyKeyboardMarkup,
+    KeyboardButton,
+    InlineKeyboardMarkup,
+    InlineKeyboardButton,
+)
 
 
 # ===================== MAIN MENU =====================
@@ -41,9 +46,69 @@ altitude_kb = ReplyKeyboardMarkup(
 )
 
 
+# ===================== SURVEY KEYBOARDS =====================
+
+spacing_kb = ReplyKeyboardMarkup(
+    keyboard=[
+        [KeyboardButton(text=str(i)) for i in [10, 20, 30]],
+        [KeyboardButton(text=str(i)) for i in [50, 75, 100]],
+        [KeyboardButton(text="❌ Cancel")]
+    ],
+    resize_keyboard=True
+)
+
+heading_kb = ReplyKeyboardMarkup(
+    keyboard=[
+        [KeyboardButton(text=str(i)) for i in [0, 45, 90]],
+        [KeyboardButton(text=str(i)) for i in [135, 180, 270]],
+        [KeyboardButton(text="❌ Cancel")]
+    ],
+    resize_keyboard=True
+)
+
+
+# ===================== MATRIX FORMAT =====================
+
+matrix_format_kb = ReplyKeyboardMarkup(
+    keyboard=[
+        [KeyboardButton(text="📄 CSV"), KeyboardButton(text="📦 NPY")],
+        [KeyboardButton(text="❌ Cancel")]
+    ],
+    resize_keyboard=True
+)
+
+
 # ===================== CANCEL ONLY =====================
 
 cancel_kb = ReplyKeyboardMarkup(
     keyboard=[[KeyboardButton(text="❌ Cancel")]],
     resize_keyboard=True
 )
+
+
+# ===================== ROUTE PREVIEW =====================
+
+def preview_kb(route_key: str) -> InlineKeyboardMarkup:
+    """Inline button requesting a PNG preview of a calculated route"""
+    return InlineKeyboardMarkup(
+        inline_keyboard=[[
+            InlineKeyboardButton(
+                text="🖼 Route preview",
+                callback_data=f"preview:{route_key}"
+            )
+        ]]
+    )
+
+
+# ===================== HISTORY =====================
+
+def redownload_kb(calculation_id: int) -> InlineKeyboardMarkup:
+    """Inline button rebuilding a stored calculation's mission file"""
+    return InlineKeyboardMarkup(
+        inline_keyboard=[[
+            InlineKeyboardButton(
+                text="⬇️ Re-download mission",
+                callback_data=f"redownload:{calculation_id}"
+            )
+        ]]
+    )
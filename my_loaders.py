@@ -1,28 +1,58 @@
 from aiogram import Bot, Dispatcher, Router
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
-from aiogram.fsm.storage.memory import MemoryStorage
 
 from utils.database import Database
+from utils.fsm_storage import BoundedMemoryStorage
+from utils.mission_cache import MissionFileCache
+from utils.spool import RecordSpool
+from utils.sender import OutboundScheduler, TunedAiohttpSession
+from utils.preview import RoutePreviewer
+from utils.geozones import GeozoneIndex
+from utils.distance_matrix import MatrixWorkers
 from config.config import load_config
 
 # ⚙️ Load config from .env
 config = load_config()
 
+# 📤 Outbound scheduler: every send goes through per-chat queues
+sender = OutboundScheduler()
+session = TunedAiohttpSession()
+session.middleware(sender)
+
 # 🤖 Telegram bot instance
 bot = Bot(
     token=config.tg_bot.token,
+    session=session,
     default=DefaultBotProperties(parse_mode=config.parse_mode)
 )
 
-# 🧠 FSM storage
-storage = MemoryStorage()
+# 🧠 FSM storage (bounded, idle flows are evicted)
+storage = BoundedMemoryStorage(
+    max_entries=config.fsm.max_entries,
+    ttl=config.fsm.ttl
+)
 dp = Dispatcher(storage=storage)
 
 # 🗄️ Database (DSN from .env)
 db = Database(dsn=config.database.dsn)
 
+# 📥 Local journal for records written while the database is down
+spool = RecordSpool(db, path=config.spool.path)
+
+# 📂 Mission file_id cache (identical missions are not re-uploaded)
+mission_cache = MissionFileCache(db)
+
+# 🖼 Route preview renderer (process pool, recent routes in memory)
+previewer = RoutePreviewer()
+
+# 📊 Shared process pool for /matrix jobs (bounded workers and jobs)
+matrix_workers = MatrixWorkers()
+
+# 🚫 Restricted zones (STR-tree, loaded at startup)
+geozones = GeozoneIndex()
+
 # 🔀 Shared router
 router = Router()
 
-__all__ = ["bot", "dp", "db", "router", "config"]
+__all__ = ["bot", "dp", "db", "router", "config", "storage", "mission_cache", "spool", "sender", "previewer", "matrix_workers", "geozones"]
@@ -6,3 +6,15 @@ class GeoStates(StatesGroup):
     second = State()
     segments = State()
     altitude = State()
+
+
+class SurveyStates(StatesGroup):
+    polygon = State()
+    spacing = State()
+    heading = State()
+    altitude = State()
+
+
+class MatrixStates(StatesGroup):
+    format = State()
+    points = State()
@@ -1,17 +1,68 @@
-from typing import Optional, Union, List
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Union, List
 import asyncpg
 from datetime import datetime
 
+# Errors meaning "database is unreachable", as opposed to query errors
+CONNECTION_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.InterfaceError,
+)
+
+
+class DatabaseUnavailable(Exception):
+    """Raised when the pool is down, times out or the circuit is open"""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        """
+        Fail-fast guard around the connection pool.
+
+        After ``failure_threshold`` consecutive connection failures the
+        circuit opens and calls fail immediately for ``reset_timeout``
+        seconds; then a trial call is let through (half-open).
+
+        :param failure_threshold: failures before opening the circuit
+        :param reset_timeout: seconds to stay open before a retry
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        """Return False while the circuit is open"""
+        if self.opened_at is None:
+            return True
+        return time.monotonic() - self.opened_at >= self.reset_timeout
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
 
 class Database:
-    def __init__(self, dsn: str):
+    def __init__(self, dsn: str, acquire_timeout: float = 3.0):
         """
         Database wrapper for async PostgreSQL operations.
 
         :param dsn: PostgreSQL connection string
+        :param acquire_timeout: seconds to wait for a pool connection
         """
         self.dsn = dsn
         self.pool: Optional[asyncpg.Pool] = None
+        self.acquire_timeout = acquire_timeout
+        self.breaker = CircuitBreaker()
 
     # ===================== CONNECTION =====================
 
@@ -24,6 +75,26 @@ class Database:
         if self.pool:
             await self.pool.close()
 
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[asyncpg.Connection]:
+        """
+        Acquire a pool connection through the circuit breaker.
+
+        Raises :class:`DatabaseUnavailable` instead of waiting on a dead
+        pool; query errors are propagated unchanged.
+        """
+        if self.pool is None or not self.breaker.allow():
+            raise DatabaseUnavailable("database circuit is open")
+
+        try:
+            async with self.pool.acquire(timeout=self.acquire_timeout) as conn:
+                yield conn
+        except CONNECTION_ERRORS as e:
+            self.breaker.record_failure()
+            raise DatabaseUnavailable(str(e) or type(e).__name__) from e
+        else:
+            self.breaker.record_success()
+
     # ===================== CORE EXECUTOR =====================
 
     async def execute(
@@ -42,7 +113,7 @@ class Database:
         - fetchrow=True  → returns single row
         - execute=True   → executes query without returning rows
         """
-        async with self.pool.acquire() as conn:
+        async with self.acquire() as conn:
             if fetch:
                 return await conn.fetch(query, *args)
             elif fetchrow:
@@ -93,6 +164,153 @@ class Database:
                 result TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
+
+            ALTER TABLE calculations
+                ADD COLUMN IF NOT EXISTS client_id TEXT UNIQUE;
+
+            ALTER TABLE calculations
+                ADD COLUMN IF NOT EXISTS waypoints BYTEA;
+            """,
+            execute=True,
+        )
+
+        await self.execute(
+            """
+            CREATE TABLE IF NOT EXISTS mission_files (
+                content_hash TEXT PRIMARY KEY,
+                file_id TEXT NOT NULL,
+                size_bytes INT NOT NULL,
+                reuse_count INT NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            """,
+            execute=True,
+        )
+
+        # Route preview images; kept apart so they do not count as
+        # mission upload savings
+        await self.execute(
+            """
+            CREATE TABLE IF NOT EXISTS preview_files (
+                route_key TEXT PRIMARY KEY,
+                file_id TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            """,
+            execute=True,
+        )
+
+        await self.execute(
+            """
+            CREATE TABLE IF NOT EXISTS api_keys (
+                id SERIAL PRIMARY KEY,
+                key_hash TEXT UNIQUE NOT NULL,
+                name TEXT NOT NULL,
+                created_by BIGINT,
+                revoked BOOLEAN NOT NULL DEFAULT FALSE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_used_at TIMESTAMP
+            );
+            """,
+            execute=True,
+        )
+
+        await self.create_stats_tables()
+
+    async def create_stats_tables(self):
+        """
+        Create counter tables kept up to date by triggers, so statistics
+        never need COUNT(*) scans over users or calculations.
+        Counters are seeded from existing rows only on first run.
+        """
+        await self.execute(
+            """
+            CREATE TABLE IF NOT EXISTS stats_counters (
+                name TEXT PRIMARY KEY,
+                value BIGINT NOT NULL DEFAULT 0
+            );
+
+            CREATE TABLE IF NOT EXISTS stats_daily_calculations (
+                day DATE PRIMARY KEY,
+                count BIGINT NOT NULL DEFAULT 0
+            );
+
+            CREATE TABLE IF NOT EXISTS stats_user_calculations (
+                user_id BIGINT PRIMARY KEY,
+                count BIGINT NOT NULL DEFAULT 0
+            );
+
+            CREATE INDEX IF NOT EXISTS stats_user_calculations_count_idx
+                ON stats_user_calculations (count DESC);
+            """,
+            execute=True,
+        )
+
+        # Seed once (the NOT EXISTS check skips the scans afterwards)
+        await self.execute(
+            """
+            INSERT INTO stats_counters (name, value)
+            SELECT 'users', (SELECT COUNT(*) FROM users)
+            WHERE NOT EXISTS (SELECT 1 FROM stats_counters WHERE name = 'users')
+            ON CONFLICT (name) DO NOTHING;
+
+            INSERT INTO stats_counters (name, value)
+            SELECT 'calculations', (SELECT COUNT(*) FROM calculations)
+            WHERE NOT EXISTS (SELECT 1 FROM stats_counters WHERE name = 'calculations')
+            ON CONFLICT (name) DO NOTHING;
+
+            INSERT INTO stats_daily_calculations (day, count)
+            SELECT created_at::DATE, COUNT(*) FROM calculations
+            WHERE NOT EXISTS (SELECT 1 FROM stats_daily_calculations)
+            GROUP BY created_at::DATE;
+
+            INSERT INTO stats_user_calculations (user_id, count)
+            SELECT user_id, COUNT(*) FROM calculations
+            WHERE NOT EXISTS (SELECT 1 FROM stats_user_calculations)
+            GROUP BY user_id;
+            """,
+            execute=True,
+        )
+
+        await self.execute(
+            """
+            CREATE OR REPLACE FUNCTION stats_users_trigger() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO stats_counters (name, value) VALUES ('users', 1)
+                    ON CONFLICT (name) DO UPDATE SET value = stats_counters.value + 1;
+                ELSE
+                    UPDATE stats_counters SET value = value - 1 WHERE name = 'users';
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE OR REPLACE FUNCTION stats_calculations_trigger() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO stats_counters (name, value) VALUES ('calculations', 1)
+                ON CONFLICT (name) DO UPDATE SET value = stats_counters.value + 1;
+
+                INSERT INTO stats_daily_calculations (day, count)
+                VALUES (COALESCE(NEW.created_at, CURRENT_TIMESTAMP)::DATE, 1)
+                ON CONFLICT (day) DO UPDATE SET count = stats_daily_calculations.count + 1;
+
+                INSERT INTO stats_user_calculations (user_id, count)
+                VALUES (NEW.user_id, 1)
+                ON CONFLICT (user_id) DO UPDATE SET count = stats_user_calculations.count + 1;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS users_stats ON users;
+            CREATE TRIGGER users_stats
+                AFTER INSERT OR DELETE ON users
+                FOR EACH ROW EXECUTE FUNCTION stats_users_trigger();
+
+            DROP TRIGGER IF EXISTS calculations_stats ON calculations;
+            CREATE TRIGGER calculations_stats
+                AFTER INSERT ON calculations
+                FOR EACH ROW EXECUTE FUNCTION stats_calculations_trigger();
             """,
             execute=True,
         )
@@ -119,17 +337,17 @@ class Database:
         return await self.execute(query, telegram_id, fetchrow=True)
 
     async def get_users_count(self) -> int:
-        """Return total number of users"""
-        query = "SELECT COUNT(*) AS count FROM users;"
+        """Return total number of users (trigger-maintained counter)"""
+        query = "SELECT value FROM stats_counters WHERE name = 'users';"
         row = await self.execute(query, fetchrow=True)
-        return row["count"] if row else 0
+        return row["value"] if row else 0
 
     # ===================== ADMINS =====================
 
     async def is_admin(self, telegram_id: int) -> bool:
         """Check if user is an admin"""
         query = "SELECT EXISTS(SELECT 1 FROM admins WHERE telegram_id = $1);"
-        async with self.pool.acquire() as conn:
+        async with self.acquire() as conn:
             return await conn.fetchval(query, telegram_id)
 
     async def add_admin(
@@ -155,11 +373,21 @@ class Database:
         coord_b: str,
         segments: int,
         result: str,
+        client_id: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+        waypoints: Optional[bytes] = None,
     ):
-        """Save calculation result"""
+        """
+        Save calculation result.
+
+        ``client_id`` makes the insert idempotent (used by the spool replay),
+        ``waypoints`` is the packed route from ``utils.waypoint_codec``.
+        """
         query = """
-            INSERT INTO calculations (user_id, coord_a, coord_b, segments, result)
-            VALUES ($1, $2, $3, $4, $5);
+            INSERT INTO calculations
+                (user_id, coord_a, coord_b, segments, result, client_id, created_at, waypoints)
+            VALUES ($1, $2, $3, $4, $5, $6, COALESCE($7, CURRENT_TIMESTAMP), $8)
+            ON CONFLICT (client_id) DO NOTHING;
         """
         await self.execute(
             query,
@@ -168,13 +396,16 @@ class Database:
             coord_b,
             segments,
             result,
+            client_id,
+            created_at,
+            waypoints,
             execute=True,
         )
 
     async def get_last_calculations(self, user_id: int, limit: int = 3):
         """Get last N calculation results for a user"""
         query = """
-            SELECT result
+            SELECT id, result, waypoints IS NOT NULL AS has_waypoints
             FROM calculations
             WHERE user_id = $1
             ORDER BY id DESC
@@ -182,6 +413,123 @@ class Database:
         """
         return await self.execute(query, user_id, limit, fetch=True)
 
+    async def get_calculation_waypoints(self, calculation_id: int, user_id: int) -> Optional[bytes]:
+        """Get packed waypoints of a user's calculation"""
+        query = """
+            SELECT waypoints
+            FROM calculations
+            WHERE id = $1 AND user_id = $2;
+        """
+        row = await self.execute(query, calculation_id, user_id, fetchrow=True)
+        return row["waypoints"] if row else None
+
+    # ===================== STATISTICS =====================
+
+    async def get_calculations_count(self) -> int:
+        """Return total number of calculations (trigger-maintained counter)"""
+        query = "SELECT value FROM stats_counters WHERE name = 'calculations';"
+        row = await self.execute(query, fetchrow=True)
+        return row["value"] if row else 0
+
+    async def get_daily_calculations(self, days: int = 7):
+        """Get calculation counts for the last N days"""
+        query = """
+            SELECT day, count
+            FROM stats_daily_calculations
+            WHERE day > CURRENT_DATE - $1::INT
+            ORDER BY day DESC;
+        """
+        return await self.execute(query, days, fetch=True)
+
+    async def get_top_users(self, limit: int = 5):
+        """Get users with the most calculations"""
+        query = """
+            SELECT s.user_id, s.count, u.full_name, u.username
+            FROM stats_user_calculations s
+            LEFT JOIN users u ON u.telegram_id = s.user_id
+            ORDER BY s.count DESC
+            LIMIT $1;
+        """
+        return await self.execute(query, limit, fetch=True)
+
+    # ===================== MISSION FILES =====================
+
+    async def get_mission_file_id(self, content_hash: str) -> Optional[str]:
+        """Get Telegram file_id of an already uploaded mission"""
+        query = "SELECT file_id FROM mission_files WHERE content_hash = $1;"
+        row = await self.execute(query, content_hash, fetchrow=True)
+        return row["file_id"] if row else None
+
+    async def save_mission_file(self, content_hash: str, file_id: str, size_bytes: int):
+        """Remember file_id of an uploaded mission"""
+        query = """
+            INSERT INTO mission_files (content_hash, file_id, size_bytes)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (content_hash) DO UPDATE SET file_id = EXCLUDED.file_id;
+        """
+        await self.execute(query, content_hash, file_id, size_bytes, execute=True)
+
+    async def mark_mission_file_reused(self, content_hash: str):
+        """Count a re-send of a cached mission"""
+        query = """
+            UPDATE mission_files
+            SET reuse_count = reuse_count + 1
+            WHERE content_hash = $1;
+        """
+        await self.execute(query, content_hash, execute=True)
+
+    async def get_mission_upload_savings(self) -> int:
+        """Return total upload bytes saved by file_id reuse"""
+        query = """
+            SELECT COALESCE(SUM(size_bytes::BIGINT * reuse_count), 0) AS saved
+            FROM mission_files;
+        """
+        row = await self.execute(query, fetchrow=True)
+        return row["saved"] if row else 0
+
+    # ===================== PREVIEW FILES =====================
+
+    async def get_preview_file_id(self, route_key: str) -> Optional[str]:
+        """Get Telegram file_id of an already uploaded route preview"""
+        query = "SELECT file_id FROM preview_files WHERE route_key = $1;"
+        row = await self.execute(query, route_key, fetchrow=True)
+        return row["file_id"] if row else None
+
+    async def save_preview_file(self, route_key: str, file_id: str):
+        """Remember file_id of an uploaded route preview"""
+        query = """
+            INSERT INTO preview_files (route_key, file_id)
+            VALUES ($1, $2)
+            ON CONFLICT (route_key) DO UPDATE SET file_id = EXCLUDED.file_id;
+        """
+        await self.execute(query, route_key, file_id, execute=True)
+
+    # ===================== API KEYS =====================
+
+    async def add_api_key(self, key_hash: str, name: str, created_by: Optional[int] = None):
+        """Store hash of a new API key"""
+        query = """
+            INSERT INTO api_keys (key_hash, name, created_by)
+            VALUES ($1, $2, $3);
+        """
+        await self.execute(query, key_hash, name, created_by, execute=True)
+
+    async def get_api_key(self, key_hash: str):
+        """Get active API key by hash and mark it as used"""
+        query = """
+            UPDATE api_keys
+            SET last_used_at = CURRENT_TIMESTAMP
+            WHERE key_hash = $1 AND NOT revoked
+            RETURNING id, name;
+        """
+        return await self.execute(query, key_hash, fetchrow=True)
+
+    async def revoke_api_key(self, name: str) -> bool:
+        """Revoke all keys with the given name"""
+        query = "UPDATE api_keys SET revoked = TRUE WHERE name = $1 AND NOT revoked;"
+        status = await self.execute(query, name, execute=True)
+        return status != "UPDATE 0"
+
     # ===================== UTILS =====================
 
     async def drop_table(self, table_name: str):
@@ -190,7 +538,7 @@ class Database:
         ⚠️ Dangerous operation!
         """
         query = f"DROP TABLE IF EXISTS {table_name} CASCADE;"
-        async with self.pool.acquire() as conn:
+        async with self.acquire() as conn:
             await conn.execute(query)
 
         print(f"🗑 Table dropped: {table_name}")
@@ -0,0 +1,232 @@
+import asyncio
+import csv
+import io
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import BinaryIO, Callable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+from geopy.distance import geodesic
+
+# WGS-84 ellipsoid
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = (1 - WGS84_F) * WGS84_A
+
+VINCENTY_MAX_ITER = 200
+VINCENTY_TOL = 1e-12
+
+# Cells per block; ~20 float64 temporaries live at once in the kernel,
+# so 250k cells keep a block around 40 MB.
+DEFAULT_BLOCK_CELLS = 250_000
+
+# Blocks submitted to the pool ahead of the writer, per worker
+IN_FLIGHT_PER_WORKER = 2
+
+
+# ===================== KERNEL =====================
+
+def geodesic_block(
+    lat1: np.ndarray,
+    lon1: np.ndarray,
+    lat2: np.ndarray,
+    lon2: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorized Vincenty inverse on WGS-84, in meters.
+
+    Inputs are degrees and broadcast against each other. Pairs that do
+    not converge (nearly antipodal points) fall back to geopy's
+    ``geodesic`` one by one.
+    """
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *(np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    )
+
+    L = lon2 - lon1
+    U1 = np.arctan((1 - WGS84_F) * np.tan(lat1))
+    U2 = np.arctan((1 - WGS84_F) * np.tan(lat2))
+    sinU1, cosU1 = np.sin(U1), np.cos(U1)
+    sinU2, cosU2 = np.sin(U2), np.cos(U2)
+
+    lam = L.copy()
+    converged = np.zeros(L.shape, dtype=bool)
+
+    for _ in range(VINCENTY_MAX_ITER):
+        sinLam, cosLam = np.sin(lam), np.cos(lam)
+        sinSigma = np.hypot(cosU2 * sinLam, cosU1 * sinU2 - sinU1 * cosU2 * cosLam)
+        cosSigma = sinU1 * sinU2 + cosU1 * cosU2 * cosLam
+        sigma = np.arctan2(sinSigma, cosSigma)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sinAlpha = np.where(sinSigma == 0, 0.0, cosU1 * cosU2 * sinLam / sinSigma)
+            cos2Alpha = 1 - sinAlpha ** 2
+            cos2SigmaM = np.where(
+                cos2Alpha == 0, 0.0, cosSigma - 2 * sinU1 * sinU2 / cos2Alpha
+            )
+
+        C = WGS84_F / 16 * cos2Alpha * (4 + WGS84_F * (4 - 3 * cos2Alpha))
+        lam_prev = lam
+        lam = L + (1 - C) * WGS84_F * sinAlpha * (
+            sigma + C * sinSigma * (cos2SigmaM + C * cosSigma * (-1 + 2 * cos2SigmaM ** 2))
+        )
+
+        converged = np.abs(lam - lam_prev) < VINCENTY_TOL
+        if converged.all():
+            break
+
+    uSq = cos2Alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    A = 1 + uSq / 16384 * (4096 + uSq * (-768 + uSq * (320 - 175 * uSq)))
+    B = uSq / 1024 * (256 + uSq * (-128 + uSq * (74 - 47 * uSq)))
+    deltaSigma = B * sinSigma * (
+        cos2SigmaM
+        + B / 4 * (
+            cosSigma * (-1 + 2 * cos2SigmaM ** 2)
+            - B / 6 * cos2SigmaM * (-3 + 4 * sinSigma ** 2) * (-3 + 4 * cos2SigmaM ** 2)
+        )
+    )
+    distances = WGS84_B * A * (sigma - deltaSigma)
+
+    for idx in zip(*np.nonzero(~converged)):
+        distances[idx] = geodesic(
+            (np.degrees(lat1[idx]), np.degrees(lon1[idx])),
+            (np.degrees(lat2[idx]), np.degrees(lon2[idx])),
+        ).meters
+
+    return distances
+
+
+def _row_block(args: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """Distances from a block of row points to all points"""
+    rows, points = args
+    return geodesic_block(
+        rows[:, 0, None], rows[:, 1, None],
+        points[None, :, 0], points[None, :, 1],
+    )
+
+
+# ===================== BLOCKED MATRIX =====================
+
+def iter_distance_blocks(
+    points: Sequence[Tuple[float, float]],
+    block_cells: int = DEFAULT_BLOCK_CELLS,
+    pool: Optional[Executor] = None,
+    max_in_flight: int = 8,
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yield the N×N distance matrix as consecutive row blocks.
+
+    With a pool, at most ``max_in_flight`` blocks are submitted ahead of
+    the consumer, so memory stays bounded regardless of N even when the
+    writer is slower than the workers.
+
+    :param points: list of (lat, lon) in degrees
+    :param block_cells: approximate number of matrix cells per block
+    :param pool: executor for the blocks (``None`` = in-process)
+    :param max_in_flight: blocks computed or waiting ahead of the consumer
+    :return: iterator of (first_row_index, block of shape (rows, N))
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(pts)
+    rows_per_block = max(1, block_cells // max(n, 1))
+    starts = iter(range(0, n, rows_per_block))
+
+    if pool is None:
+        for start in starts:
+            yield start, _row_block((pts[start: start + rows_per_block], pts))
+        return
+
+    window: deque = deque()
+    try:
+        for start in starts:
+            window.append((start, pool.submit(_row_block, (pts[start: start + rows_per_block], pts))))
+            if len(window) >= max_in_flight:
+                first, future = window.popleft()
+                yield first, future.result()
+        while window:
+            first, future = window.popleft()
+            yield first, future.result()
+    finally:
+        for _, future in window:
+            future.cancel()
+
+
+class MatrixWorkers:
+    def __init__(self, workers: Optional[int] = None, max_jobs: int = 2):
+        """
+        Process pool shared by all matrix jobs.
+
+        :param workers: worker processes (default: CPU count, at most 4)
+        :param max_jobs: matrices computed at the same time; further
+                         requests wait for a free slot
+        """
+        self.workers = workers or min(os.cpu_count() or 1, 4)
+        self._jobs = asyncio.Semaphore(max_jobs)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Workers are started from the writer thread; forkserver avoids
+            # forking a multi-threaded process
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver") if "forkserver" in methods else None
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self._executor
+
+    async def run(self, func: Callable, *args, parallel: bool = True):
+        """
+        Run a blocking matrix writer in a thread, passing it the shared pool.
+
+        :param func: callable accepting ``pool=`` keyword
+        :param parallel: ``False`` computes the blocks in the thread itself
+        """
+        async with self._jobs:
+            pool = self._pool() if parallel and self.workers > 1 else None
+            return await asyncio.to_thread(
+                func, *args, pool=pool, max_in_flight=self.workers * IN_FLIGHT_PER_WORKER
+            )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# ===================== WRITERS =====================
+
+def write_csv(
+    out: BinaryIO,
+    points: Sequence[Tuple[float, float]],
+    block_cells: int = DEFAULT_BLOCK_CELLS,
+    pool: Optional[Executor] = None,
+    max_in_flight: int = 8,
+):
+    """Write distance matrix (meters) as CSV with a header row of indices"""
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    writer = csv.writer(text)
+    writer.writerow([""] + list(range(len(points))))
+    for start, block in iter_distance_blocks(points, block_cells, pool, max_in_flight):
+        for offset, row in enumerate(block):
+            writer.writerow([start + offset] + [f"{d:.1f}" for d in row])
+    text.detach()
+
+
+def write_npy(
+    out: BinaryIO,
+    points: Sequence[Tuple[float, float]],
+    block_cells: int = DEFAULT_BLOCK_CELLS,
+    pool: Optional[Executor] = None,
+    max_in_flight: int = 8,
+):
+    """Write distance matrix (meters, float32) in NumPy ``.npy`` format"""
+    n = len(points)
+    np.lib.format.write_array_header_1_0(
+        out,
+        {"descr": np.lib.format.dtype_to_descr(np.dtype("<f4")),
+         "fortran_order": False,
+         "shape": (n, n)},
+    )
+    for _, block in iter_distance_blocks(points, block_cells, pool, max_in_flight):
+        out.write(block.astype("<f4").tobytes())
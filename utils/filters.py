@@ -0,0 +1,17 @@
+from aiogram import types
+from aiogram.filters import BaseFilter
+
+from my_loaders import db, config
+
+
+class IsAdmin(BaseFilter):
+    """
+    Passes only for bot admins: IDs from ``ADMIN_IDS`` or rows
+    in the ``admins`` table.
+    """
+
+    async def __call__(self, message: types.Message) -> bool:
+        user_id = message.from_user.id
+        if user_id in config.admins.ids:
+            return True
+        return bool(await db.is_admin(user_id))
@@ -0,0 +1,183 @@
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+
+# Interned record layouts: every /coordinate flow has the same keys, so
+# records share one layout tuple instead of carrying their own dict keys
+_LAYOUTS: Dict[tuple, tuple] = {}
+MAX_LAYOUTS = 1024
+
+
+def _is_float_tuple(value: Any) -> bool:
+    return type(value) is tuple and bool(value) and all(type(v) is float for v in value)
+
+
+class _Record:
+    """
+    Single FSM entry: state name, packed data and last access time.
+
+    Data is split by a shared layout ``((float keys and lengths), other keys)``:
+    all float tuples (``coord_a``, ``coord_b``) live in one C double array,
+    remaining values in a plain tuple. No per-entry dict or float objects.
+    """
+
+    __slots__ = ("state", "layout", "floats", "values", "touched")
+
+    def __init__(self, touched: float):
+        self.state: Optional[str] = None
+        self.layout: Optional[tuple] = None
+        self.floats: Optional[array] = None
+        self.values: tuple = ()
+        self.touched = touched
+
+    @property
+    def empty(self) -> bool:
+        return self.layout is None
+
+    def pack(self, data: Mapping[str, Any]):
+        float_keys = []
+        other_keys = []
+        floats = array("d")
+        values = []
+        for key, value in data.items():
+            if _is_float_tuple(value):
+                float_keys.append((key, len(value)))
+                floats.extend(value)
+            else:
+                other_keys.append(key)
+                values.append(value)
+
+        layout = (tuple(float_keys), tuple(other_keys))
+        if len(_LAYOUTS) < MAX_LAYOUTS:
+            layout = _LAYOUTS.setdefault(layout, layout)
+
+        self.layout = layout
+        self.floats = floats if floats else None
+        self.values = tuple(values)
+
+    def unpack(self) -> Dict[str, Any]:
+        if self.layout is None:
+            return {}
+        float_keys, other_keys = self.layout
+        data: Dict[str, Any] = {}
+        offset = 0
+        for key, length in float_keys:
+            data[key] = tuple(self.floats[offset:offset + length])
+            offset += length
+        data.update(zip(other_keys, self.values))
+        return data
+
+    def clear(self):
+        self.layout = None
+        self.floats = None
+        self.values = ()
+
+
+class BoundedMemoryStorage(BaseStorage):
+    def __init__(self, max_entries: int = 10_000, ttl: float = 3600.0):
+        """
+        In-memory FSM storage with an entry cap and idle TTL eviction.
+
+        Entries are kept in access order, so both the oldest idle entry
+        and the least recently used one sit at the front of the dict and
+        are evicted in O(1) without any background task.
+
+        :param max_entries: maximum number of resident entries
+        :param ttl: seconds of inactivity after which an entry is dropped
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._records: "OrderedDict[StorageKey, _Record]" = OrderedDict()
+
+        self.evicted_ttl = 0
+        self.evicted_capacity = 0
+
+    # ===================== EVICTION =====================
+
+    def _expire(self, now: float):
+        """Drop idle entries from the front of the access order"""
+        deadline = now - self.ttl
+        while self._records:
+            key, record = next(iter(self._records.items()))
+            if record.touched > deadline:
+                break
+            del self._records[key]
+            self.evicted_ttl += 1
+
+    def _lookup(self, key: StorageKey) -> Optional[_Record]:
+        """Return a live record without creating one"""
+        now = time.monotonic()
+        self._expire(now)
+        record = self._records.get(key)
+        if record is not None:
+            record.touched = now
+            self._records.move_to_end(key)
+        return record
+
+    def _ensure(self, key: StorageKey) -> _Record:
+        """Return a live record, creating (and making room for) it if needed"""
+        record = self._lookup(key)
+        if record is None:
+            while len(self._records) >= self.max_entries:
+                self._records.popitem(last=False)
+                self.evicted_capacity += 1
+            record = _Record(time.monotonic())
+            self._records[key] = record
+        return record
+
+    def _release_if_empty(self, key: StorageKey, record: _Record):
+        """Finished flows (state cleared, no data) take no memory"""
+        if record.state is None and record.empty:
+            self._records.pop(key, None)
+
+    # ===================== STORAGE API =====================
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        state = state.state if isinstance(state, State) else state
+        if state is None:
+            record = self._lookup(key)
+            if record is None:
+                return
+        else:
+            record = self._ensure(key)
+        record.state = state
+        self._release_if_empty(key, record)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        record = self._lookup(key)
+        return record.state if record else None
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not data:
+            record = self._lookup(key)
+            if record is None:
+                return
+            record.clear()
+        else:
+            record = self._ensure(key)
+            record.pack(data)
+        self._release_if_empty(key, record)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        record = self._lookup(key)
+        return record.unpack() if record else {}
+
+    async def close(self) -> None:
+        self._records.clear()
+
+    # ===================== METRICS =====================
+
+    def stats(self) -> Dict[str, int]:
+        """Return resident size and eviction counters"""
+        self._expire(time.monotonic())
+        return {
+            "size": len(self._records),
+            "max_entries": self.max_entries,
+            "evicted_ttl": self.evicted_ttl,
+            "evicted_capacity": self.evicted_capacity,
+        }
@@ -0,0 +1,203 @@
+import html
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon, shape
+
+logger = logging.getLogger(__name__)
+
+Waypoint = Tuple[float, float, int]
+
+# INAV firmware limits for geozones stored with a mission
+MAX_MISSION_GEOZONES = 63
+MAX_MISSION_GEOZONE_VERTICES = 126
+
+ZONE_TYPES = ("exclusive", "inclusive")
+
+
+@dataclass
+class Geozone:
+    id: int
+    name: str
+    polygon: Polygon
+    min_alt: int = 0
+    max_alt: int = 0  # 0 = no upper limit
+    type: str = "exclusive"
+
+    @property
+    def vertices(self) -> List[Tuple[float, float]]:
+        """Exterior ring as (lat, lon) without the closing vertex"""
+        return [(lat, lon) for lon, lat in self.polygon.exterior.coords[:-1]]
+
+
+@dataclass
+class ZoneConflict:
+    segment: int  # segment from waypoint ``segment`` to ``segment + 1``
+    zone: Geozone
+
+
+def _zones_from_feature(feature: Dict[str, Any], next_id: int) -> List[Geozone]:
+    geometry = shape(feature["geometry"])
+    props = feature.get("properties") or {}
+    name = str(props.get("name") or f"Zone {next_id}")
+
+    zone_type = str(props.get("type", "exclusive")).lower()
+    if zone_type not in ZONE_TYPES:
+        raise ValueError(f"unknown zone type {zone_type!r}")
+
+    if geometry.geom_type == "Polygon":
+        polygons = [geometry]
+    elif geometry.geom_type == "MultiPolygon":
+        polygons = list(geometry.geoms)
+    else:
+        return []
+
+    return [
+        Geozone(
+            id=next_id + i,
+            name=name,
+            polygon=polygon,
+            min_alt=int(props.get("min_alt", 0)),
+            max_alt=int(props.get("max_alt", 0)),
+            type=zone_type,
+        )
+        for i, polygon in enumerate(polygons)
+    ]
+
+
+class GeozoneIndex:
+    def __init__(self):
+        """
+        Restricted-airspace polygons behind an STR-tree.
+
+        Routes are checked in batch: all segments become one array of
+        line strings and a single bulk ``STRtree.query`` returns every
+        (segment, zone) intersection.
+        """
+        self.zones: List[Geozone] = []
+        self._tree: Optional[shapely.STRtree] = None
+        self._min_alt = np.empty(0)
+        self._max_alt = np.empty(0)
+        self._exclusive = np.empty(0, dtype=bool)
+
+    # ===================== LOADING =====================
+
+    def build(self, zones: Sequence[Geozone]):
+        self.zones = list(zones)
+        self._tree = shapely.STRtree([z.polygon for z in self.zones]) if self.zones else None
+        self._min_alt = np.array([z.min_alt for z in self.zones], dtype=np.float64)
+        max_alt = np.array([z.max_alt for z in self.zones], dtype=np.float64)
+        self._max_alt = np.where(max_alt > 0, max_alt, np.inf)
+        self._exclusive = np.array([z.type == "exclusive" for z in self.zones], dtype=bool)
+
+    def load(self, path: str) -> int:
+        """
+        Load zones from a GeoJSON FeatureCollection.
+
+        Supported feature properties: ``name``, ``min_alt``, ``max_alt``
+        (meters, 0 = unlimited) and ``type`` (exclusive / inclusive).
+
+        :return: number of zones loaded
+        """
+        with open(path, encoding="utf-8") as f:
+            collection = json.load(f)
+
+        zones: List[Geozone] = []
+        for feature in collection.get("features", []):
+            try:
+                zones.extend(_zones_from_feature(feature, len(zones)))
+            except Exception as e:
+                logger.warning(f"Skipping invalid geozone feature: {e}")
+
+        self.build(zones)
+        return len(zones)
+
+    # ===================== CHECKING =====================
+
+    def check_route(self, points: Sequence[Waypoint]) -> List[ZoneConflict]:
+        """
+        Find route segments crossing restricted zones.
+
+        A segment conflicts if it intersects an exclusive (no-fly) zone
+        and its altitude range overlaps the zone's ``min_alt``..``max_alt``.
+
+        :param points: sequence of (lat, lon, alt)
+        :return: conflicts ordered by segment
+        """
+        if self._tree is None or len(points) < 2:
+            return []
+
+        array = np.asarray(points, dtype=np.float64)
+        coords = array[:, [1, 0]]  # shapely works in (x=lon, y=lat)
+        segments = shapely.linestrings(np.stack((coords[:-1], coords[1:]), axis=1))
+
+        seg_idx, zone_idx = self._tree.query(segments, predicate="intersects")
+        if seg_idx.size == 0:
+            return []
+
+        alt = array[:, 2]
+        seg_low = np.minimum(alt[:-1], alt[1:])[seg_idx]
+        seg_high = np.maximum(alt[:-1], alt[1:])[seg_idx]
+        hit = (
+            self._exclusive[zone_idx]
+            & (seg_high >= self._min_alt[zone_idx])
+            & (seg_low <= self._max_alt[zone_idx])
+        )
+
+        order = np.lexsort((zone_idx[hit], seg_idx[hit]))
+        return [
+            ZoneConflict(segment=int(s), zone=self.zones[int(z)])
+            for s, z in zip(seg_idx[hit][order], zone_idx[hit][order])
+        ]
+
+
+def mission_geozones(conflicts: Sequence[ZoneConflict]) -> Tuple[List[Geozone], int]:
+    """
+    Pick distinct conflicting zones that fit INAV's geozone limits.
+
+    :return: (zones to write into the mission, number of zones left out)
+    """
+    selected: List[Geozone] = []
+    seen = set()
+    vertices = 0
+    skipped = 0
+
+    for conflict in conflicts:
+        zone = conflict.zone
+        if zone.id in seen:
+            continue
+        seen.add(zone.id)
+
+        count = len(zone.vertices)
+        if len(selected) >= MAX_MISSION_GEOZONES or vertices + count > MAX_MISSION_GEOZONE_VERTICES:
+            skipped += 1
+            continue
+        selected.append(zone)
+        vertices += count
+
+    return selected, skipped
+
+
+def conflict_warning(conflicts: Sequence[ZoneConflict], skipped: int = 0, limit: int = 20) -> str:
+    """
+    User warning (HTML) listing offending segments.
+
+    :param conflicts: result of :meth:`GeozoneIndex.check_route`
+    :param skipped: zones that did not fit into the mission file
+    :param limit: max segments listed
+    """
+    lines = ["🚫 <b>Route crosses restricted zones!</b>"]
+    lines += [
+        f"• Segment {c.segment}→{c.segment + 1}: <b>{html.escape(c.zone.name)}</b>"
+        for c in conflicts[:limit]
+    ]
+    if len(conflicts) > limit:
+        lines.append(f"… and {len(conflicts) - limit} more")
+    lines.append("\n📂 Crossed zones are added to the mission geozones.")
+    if skipped:
+        lines.append(f"⚠️ {skipped} zones skipped (INAV geozone limits).")
+    return "\n".join(lines)
@@ -0,0 +1,104 @@
+import hashlib
+import xml.etree.ElementTree as ET
+from typing import TYPE_CHECKING, Iterable, Optional, Sequence, Tuple
+from xml.dom import minidom
+
+if TYPE_CHECKING:
+    from utils.geozones import Geozone
+
+Waypoint = Tuple[float, float, int]
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# INAV geozone enums (see ``geozone`` CLI command)
+GEOZONE_SHAPE_POLYGON = "1"
+GEOZONE_TYPES = {"exclusive": "0", "inclusive": "1"}
+GEOZONE_ACTION_AVOID = "1"
+
+
+def _add_geozones(mission: ET.Element, geozones: Sequence["Geozone"]):
+    section = ET.SubElement(mission, "geozones", {"count": str(len(geozones))})
+    for zone_id, zone in enumerate(geozones):
+        element = ET.SubElement(
+            section,
+            "geozone",
+            {
+                "id": str(zone_id),
+                "shape": GEOZONE_SHAPE_POLYGON,
+                "type": GEOZONE_TYPES.get(zone.type, "0"),
+                # INAV stores zone altitudes in centimeters
+                "minalt": str(zone.min_alt * 100),
+                "maxalt": str(zone.max_alt * 100),
+                "isamsl": "0",
+                "action": GEOZONE_ACTION_AVOID,
+                "name": zone.name,
+            },
+        )
+        for vertex_id, (lat, lon) in enumerate(zone.vertices):
+            ET.SubElement(
+                element,
+                "vertex",
+                {"id": str(vertex_id), "lat": f"{lat:.7f}", "lon": f"{lon:.7f}"},
+            )
+
+
+def build_mission_xml(
+    points: Iterable[Waypoint],
+    geozones: Optional[Sequence["Geozone"]] = None,
+) -> str:
+    """
+    Build INAV mission XML for the given waypoints.
+
+    :param points: sequence of (lat, lon, alt) tuples
+    :param geozones: zones written into the ``geozones`` section
+    :return: full mission file text
+    """
+    points = list(points)
+
+    mission = ET.Element("mission")
+    ET.SubElement(mission, "version", {"value": "2.3-pre8"})
+    ET.SubElement(
+        mission,
+        "mwp",
+        {
+            "cx": f"{points[0][1]:.7f}",
+            "cy": f"{points[0][0]:.7f}",
+            "home-x": "0",
+            "home-y": "0",
+            "zoom": "13",
+        },
+    )
+    _add_geozones(mission, geozones or [])
+
+    for i, (lat, lon, alt) in enumerate(points, start=1):
+        ET.SubElement(
+            mission,
+            "missionitem",
+            {
+                "no": str(i),
+                "action": "WAYPOINT",
+                "lat": f"{lat:.7f}",
+                "lon": f"{lon:.7f}",
+                "alt": str(alt),
+                "parameter1": "0",
+                "parameter2": "0",
+                "parameter3": "0",
+                "flag": "165" if i == len(points) else "0",
+            },
+        )
+
+    xml_string = minidom.parseString(ET.tostring(mission)).toprettyxml(indent="\t")
+    return XML_HEADER + xml_string
+
+
+def mission_hash(content: bytes) -> str:
+    """Content address of a mission file (SHA-256 hex digest)"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def route_key(*mission_xmls: str) -> str:
+    """
+    Short route key derived from mission content; fits Telegram
+    callback data (64 bytes) together with a prefix.
+    """
+    return mission_hash("".join(mission_xmls).encode("utf-8"))[:40]
@@ -0,0 +1,173 @@
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from aiogram import types
+from aiogram.types import BufferedInputFile
+
+from utils.database import Database, DatabaseUnavailable
+from utils.mission import mission_hash
+
+logger = logging.getLogger(__name__)
+
+
+class MissionFileCache:
+    def __init__(self, db: Database, max_entries: int = 1024):
+        """
+        Content-addressed cache of Telegram file_ids for mission documents.
+
+        Lookups go through an in-memory LRU first and fall back to the
+        ``mission_files`` table, so identical missions are re-sent by
+        ``file_id`` instead of being uploaded again. Route preview photos
+        use the same LRU (``png:`` keys) but their own ``preview_files``
+        table, and do not count towards mission upload savings.
+
+        :param db: database wrapper
+        :param max_entries: size of the in-memory front cache
+        """
+        self.db = db
+        self.max_entries = max_entries
+        self._file_ids: "OrderedDict[str, str]" = OrderedDict()
+
+        self.uploads = 0
+        self.reuses = 0
+        self.bytes_saved = 0
+        self.photo_reuses = 0
+
+    # ===================== LOOKUP =====================
+
+    def _remember(self, content_hash: str, file_id: str):
+        self._file_ids[content_hash] = file_id
+        self._file_ids.move_to_end(content_hash)
+        while len(self._file_ids) > self.max_entries:
+            self._file_ids.popitem(last=False)
+
+    async def _lookup(self, key: str, fetch: Callable[[str], Awaitable[Optional[str]]], db_key: str):
+        file_id = self._file_ids.get(key)
+        if file_id is not None:
+            self._file_ids.move_to_end(key)
+            return file_id
+
+        try:
+            file_id = await fetch(db_key)
+        except DatabaseUnavailable:
+            return None
+        if file_id is not None:
+            self._remember(key, file_id)
+        return file_id
+
+    async def get_file_id(self, content_hash: str) -> Optional[str]:
+        """Return cached file_id for the mission content hash, if any"""
+        return await self._lookup(content_hash, self.db.get_mission_file_id, content_hash)
+
+    async def get_photo_file_id(self, route_key: str) -> Optional[str]:
+        """Return cached file_id for the route preview, if any"""
+        return await self._lookup(f"png:{route_key}", self.db.get_preview_file_id, route_key)
+
+    async def _db_call(self, method, *args):
+        """Cache bookkeeping must never fail a send"""
+        try:
+            await method(*args)
+        except DatabaseUnavailable as e:
+            logger.warning(f"Mission cache not persisted: {e}")
+
+    # ===================== SENDING =====================
+
+    async def send_mission(
+        self,
+        message: types.Message,
+        content: str,
+        **kwargs,
+    ) -> types.Message:
+        """
+        Send mission file as a document, reusing a known file_id when
+        the same content has already been uploaded.
+
+        A reused file_id keeps the name of its first upload, so the name
+        is derived from the content only (``INAV_<hash>.mission``) and
+        never carries anything about the requesting user.
+
+        :param message: message to answer
+        :param content: mission file text
+        :param kwargs: extra ``answer_document`` arguments (caption, markup)
+        """
+        data = content.encode("utf-8")
+        content_hash = mission_hash(data)
+
+        file_id = await self.get_file_id(content_hash)
+        if file_id is not None:
+            try:
+                sent = await message.answer_document(file_id, **kwargs)
+            except Exception as e:
+                # Stale or foreign file_id — forget it and upload again
+                logger.warning(f"Cached file_id rejected for {content_hash[:12]}: {e}")
+                self._file_ids.pop(content_hash, None)
+            else:
+                self.reuses += 1
+                self.bytes_saved += len(data)
+                await self._db_call(self.db.mark_mission_file_reused, content_hash)
+                logger.info(
+                    f"♻️ Mission {content_hash[:12]} re-sent by file_id, "
+                    f"{len(data)} bytes upload saved (total {self.bytes_saved})"
+                )
+                return sent
+
+        sent = await message.answer_document(
+            BufferedInputFile(data, filename=f"INAV_{content_hash[:12]}.mission"),
+            **kwargs,
+        )
+        self.uploads += 1
+
+        if sent.document:
+            file_id = sent.document.file_id
+            self._remember(content_hash, file_id)
+            await self._db_call(self.db.save_mission_file, content_hash, file_id, len(data))
+        return sent
+
+    async def send_photo(
+        self,
+        message: types.Message,
+        route_key: str,
+        render: Optional[Callable[[], Awaitable[bytes]]],
+        filename: str,
+        **kwargs,
+    ) -> Optional[types.Message]:
+        """
+        Send a route preview photo; ``render`` is only awaited when no
+        usable file_id is known for the route.
+
+        :param message: message to answer
+        :param route_key: route key of the preview
+        :param render: async callable producing PNG bytes, ``None`` if the
+                       route is no longer available
+        :param filename: file name used for a fresh upload
+        :param kwargs: extra ``answer_photo`` arguments
+        :return: sent message, or ``None`` if nothing could be sent
+        """
+        key = f"png:{route_key}"
+        file_id = await self.get_photo_file_id(route_key)
+        if file_id is not None:
+            try:
+                sent = await message.answer_photo(file_id, **kwargs)
+            except Exception as e:
+                logger.warning(f"Cached photo file_id rejected for {route_key[:12]}: {e}")
+                self._file_ids.pop(key, None)
+            else:
+                self.photo_reuses += 1
+                return sent
+
+        if render is None:
+            return None
+
+        data = await render()
+        sent = await message.answer_photo(
+            BufferedInputFile(data, filename=filename),
+            **kwargs,
+        )
+        self.uploads += 1
+
+        if sent.photo:
+            file_id = sent.photo[-1].file_id
+            self._remember(key, file_id)
+            await self._db_call(self.db.save_preview_file, route_key, file_id)
+        return sent
@@ -0,0 +1,221 @@
+import asyncio
+import io
+import math
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from utils.waypoint_codec import decode_waypoints, encode_waypoints
+
+Waypoint = Tuple[float, float, int]
+
+EARTH_RADIUS_M = 6_371_008.8
+
+WIDTH = 1000
+MAP_HEIGHT = 640
+PROFILE_HEIGHT = 220
+MARGIN = 50
+
+# Above this many waypoints labels would overlap into noise
+MAX_LABELED_POINTS = 40
+
+BACKGROUND = (250, 250, 247)
+GRID = (225, 225, 220)
+TRACK = (33, 102, 172)
+POINT = (214, 96, 77)
+TEXT = (40, 40, 40)
+PROFILE_FILL = (166, 206, 227)
+
+
+def _font(size: int):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+def _project(points: Sequence[Waypoint]) -> List[Tuple[float, float]]:
+    """Equirectangular projection to local east/north meters around point 0"""
+    lat0 = math.radians(points[0][0])
+    lon0 = math.radians(points[0][1])
+    cos_lat0 = math.cos(lat0)
+    return [
+        (
+            (math.radians(lon) - lon0) * cos_lat0 * EARTH_RADIUS_M,
+            (math.radians(lat) - lat0) * EARTH_RADIUS_M,
+        )
+        for lat, lon, _ in points
+    ]
+
+
+def _format_distance(meters: float) -> str:
+    return f"{meters / 1000:.2f} km" if meters >= 1000 else f"{meters:.0f} m"
+
+
+def _draw_map(draw: ImageDraw.ImageDraw, xy: List[Tuple[float, float]], labeled: bool):
+    xs = [p[0] for p in xy]
+    ys = [p[1] for p in xy]
+    span = max(max(xs) - min(xs), max(ys) - min(ys), 1.0)
+    scale = min(WIDTH - 2 * MARGIN, MAP_HEIGHT - 2 * MARGIN) / span
+    cx = (max(xs) + min(xs)) / 2
+    cy = (max(ys) + min(ys)) / 2
+
+    def to_px(x: float, y: float) -> Tuple[float, float]:
+        return WIDTH / 2 + (x - cx) * scale, MAP_HEIGHT / 2 - (y - cy) * scale
+
+    pixels = [to_px(x, y) for x, y in xy]
+    small = _font(13)
+
+    # Scale bar: round length close to a fifth of the map width
+    raw = (WIDTH - 2 * MARGIN) / 5 / scale
+    bar_m = 10 ** math.floor(math.log10(raw))
+    for step in (1, 2, 5, 10):
+        if bar_m * step >= raw:
+            bar_m *= step
+            break
+    bar_px = bar_m * scale
+    y0 = MAP_HEIGHT - 20
+    draw.line([(MARGIN, y0), (MARGIN + bar_px, y0)], fill=TEXT, width=3)
+    draw.text((MARGIN, y0 - 18), _format_distance(bar_m), fill=TEXT, font=small)
+    # North arrow
+    ax = WIDTH - MARGIN
+    draw.polygon([(ax, 12), (ax - 7, 30), (ax + 7, 30)], fill=TEXT)
+    draw.text((ax - 5, 34), "N", fill=TEXT, font=_font(16))
+
+    draw.line(pixels, fill=TRACK, width=3, joint="curve")
+
+    radius = 5 if labeled else 2
+    for i, (px, py) in enumerate(pixels):
+        draw.ellipse([px - radius, py - radius, px + radius, py + radius], fill=POINT)
+        if labeled:
+            draw.text((px + 7, py - 16), str(i), fill=POINT, font=small)
+
+    if labeled:
+        for i in range(len(xy) - 1):
+            length = math.dist(xy[i], xy[i + 1])
+            mx = (pixels[i][0] + pixels[i + 1][0]) / 2
+            my = (pixels[i][1] + pixels[i + 1][1]) / 2
+            draw.text((mx + 6, my + 4), _format_distance(length), fill=TEXT, font=small)
+
+
+def _draw_profile(
+    draw: ImageDraw.ImageDraw,
+    xy: List[Tuple[float, float]],
+    altitudes: List[int],
+    labeled: bool,
+):
+    top = MAP_HEIGHT + 50
+    bottom = MAP_HEIGHT + PROFILE_HEIGHT - 30
+    small = _font(13)
+
+    draw.line([(0, MAP_HEIGHT), (WIDTH, MAP_HEIGHT)], fill=GRID, width=2)
+    draw.text((MARGIN, MAP_HEIGHT + 8), "Altitude profile", fill=TEXT, font=small)
+
+    cumulative = [0.0]
+    for i in range(len(xy) - 1):
+        cumulative.append(cumulative[-1] + math.dist(xy[i], xy[i + 1]))
+    total = max(cumulative[-1], 1.0)
+
+    low = min(0, min(altitudes))
+    high = max(max(altitudes), low + 1)
+
+    def to_px(dist: float, alt: float) -> Tuple[float, float]:
+        x = MARGIN + dist / total * (WIDTH - 2 * MARGIN)
+        y = bottom - (alt - low) / (high - low) * (bottom - top)
+        return x, y
+
+    pixels = [to_px(d, a) for d, a in zip(cumulative, altitudes)]
+    draw.polygon(
+        [(MARGIN, bottom)] + pixels + [(WIDTH - MARGIN, bottom)],
+        fill=PROFILE_FILL,
+    )
+    draw.line(pixels, fill=TRACK, width=2)
+    draw.line([(MARGIN, bottom), (WIDTH - MARGIN, bottom)], fill=TEXT, width=1)
+    draw.text((MARGIN, bottom + 6), "0", fill=TEXT, font=small)
+    draw.text((WIDTH - MARGIN - 60, bottom + 6), _format_distance(total), fill=TEXT, font=small)
+    draw.text((8, top - 6), f"{high} m", fill=TEXT, font=small)
+
+    if labeled:
+        for (px, py), alt in zip(pixels, altitudes):
+            draw.text((px - 8, py - 16), str(alt), fill=TEXT, font=small)
+
+
+def render_route_png(points: Sequence[Waypoint]) -> bytes:
+    """
+    Render route preview: track in local meters with point and segment
+    labels, plus an altitude profile strip.
+
+    Pure function of the waypoints so it can run in a worker process.
+
+    :param points: sequence of (lat, lon, alt)
+    :return: PNG bytes
+    """
+    points = list(points)
+    xy = _project(points)
+    labeled = len(points) <= MAX_LABELED_POINTS
+
+    image = Image.new("RGB", (WIDTH, MAP_HEIGHT + PROFILE_HEIGHT), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    _draw_map(draw, xy, labeled)
+    _draw_profile(draw, xy, [alt for _, _, alt in points], labeled)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+class RoutePreviewer:
+    def __init__(self, workers: int = 2, max_routes: int = 1000, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Renders route previews off the event loop in a process pool and
+        remembers recent routes so a preview can be requested later.
+
+        Routes are kept packed (:func:`encode_waypoints`, ~10 bytes per
+        waypoint before compression) and bounded by count and total size.
+
+        :param workers: worker processes for rendering
+        :param max_routes: recent routes kept in memory
+        :param max_bytes: total size of kept packed routes
+        """
+        self.workers = workers
+        self.max_routes = max_routes
+        self.max_bytes = max_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._routes: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+
+    def remember(self, key: str, points: Sequence[Waypoint]):
+        blob = encode_waypoints(points)
+        old = self._routes.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._routes[key] = blob
+        self._bytes += len(blob)
+        while len(self._routes) > self.max_routes or self._bytes > self.max_bytes:
+            _, evicted = self._routes.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def get(self, key: str) -> Optional[List[Waypoint]]:
+        blob = self._routes.get(key)
+        if blob is None:
+            return None
+        points, _ = decode_waypoints(blob)
+        return points
+
+    async def render(self, points: Sequence[Waypoint]) -> bytes:
+        if self._executor is None:
+            # Started from the multi-threaded bot process: use forkserver
+            # like the matrix pool (utils.distance_matrix.MatrixWorkers)
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver") if "forkserver" in methods else None
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, render_route_png, list(points))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
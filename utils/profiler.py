@@ -0,0 +1,107 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Frames from these modules are attributed to a bot handler
+HANDLER_MODULE_PREFIX = "handlers."
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.01):
+        """
+        Low-overhead statistical profiler for a running thread.
+
+        A daemon thread periodically reads the target thread's Python
+        stack via ``sys._current_frames()``; nothing is instrumented, so
+        the bot keeps running at full speed between samples.
+
+        :param thread_id: thread to sample (defaults to the calling thread,
+                          i.e. the event loop thread)
+        :param interval: seconds between samples
+        """
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+
+        self.stacks: Counter = Counter()
+        self.handlers: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+
+    # ===================== SAMPLING =====================
+
+    def start(self):
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.monotonic() - self._started_at
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            self._sample(frame)
+
+    def _sample(self, frame):
+        stack: List[str] = []
+        handler = None
+        while frame is not None:
+            stack.append(_frame_label(frame))
+            module = frame.f_globals.get("__name__", "")
+            if module.startswith(HANDLER_MODULE_PREFIX):
+                # Outermost handler frame wins (we walk leaf → root)
+                handler = f"{module[len(HANDLER_MODULE_PREFIX):]}.{frame.f_code.co_name}"
+            frame = frame.f_back
+
+        stack.reverse()
+        self.stacks[";".join(stack)] += 1
+        self.handlers[handler or "<idle / framework>"] += 1
+        self.samples += 1
+
+    # ===================== REPORTS =====================
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format (flamegraph.pl / speedscope input)"""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+    def top_functions(self, limit: int = 15) -> List[Tuple[str, int, int]]:
+        """
+        Hottest functions.
+
+        :return: list of (function, self samples, inclusive samples)
+        """
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        return [(name, own[name], total[name]) for name, _ in own.most_common(limit)]
+
+    def handler_breakdown(self) -> Dict[str, int]:
+        """Samples attributed to each handler function"""
+        return dict(self.handlers.most_common())
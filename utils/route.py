@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+from geopy.distance import geodesic
+
+Coordinate = Tuple[float, float]
+Waypoint = Tuple[float, float, int]
+
+MAX_SEGMENTS = 1000
+
+# Waypoint altitude range in meters (stored as int16 with the route)
+MIN_ALTITUDE = -1000
+MAX_ALTITUDE = 10_000
+
+
+@dataclass
+class Route:
+    points: List[Waypoint]
+    distances: List[float]
+    total_km: float
+
+    @property
+    def avg_segment_km(self) -> float:
+        return self.total_km / max(len(self.points) - 1, 1)
+
+
+def validate_coordinate(point: Sequence[float]) -> Coordinate:
+    """Return (lat, lon) as floats or raise ValueError"""
+    lat, lon = map(float, point)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"Coordinate out of range: {lat}, {lon}")
+    return lat, lon
+
+
+def validate_altitude(altitude: int) -> int:
+    """Return altitude or raise ValueError if it is outside the range"""
+    if not MIN_ALTITUDE <= altitude <= MAX_ALTITUDE:
+        raise ValueError(f"Altitude must be between {MIN_ALTITUDE} and {MAX_ALTITUDE} m")
+    return altitude
+
+
+def compute_route(
+    point_a: Coordinate,
+    point_b: Coordinate,
+    segments: int,
+    altitudes: Sequence[int],
+) -> Route:
+    """
+    Split the A→B line into equal segments and measure them.
+
+    Shared by the Telegram flow and the HTTP API.
+
+    :param point_a: start (lat, lon)
+    :param point_b: end (lat, lon)
+    :param segments: number of segments (waypoints = segments + 1)
+    :param altitudes: altitude values assigned to waypoints cyclically
+    :return: :class:`Route` with waypoints, segment distances (m) and total km
+    """
+    if not 1 <= segments <= MAX_SEGMENTS:
+        raise ValueError(f"Segments must be between 1 and {MAX_SEGMENTS}")
+    if not altitudes:
+        raise ValueError("At least one altitude is required")
+    for altitude in altitudes:
+        validate_altitude(altitude)
+
+    # Generate intermediate points
+    points = []
+    for i in range(segments + 1):
+        fraction = i / segments
+        lat = point_a[0] + (point_b[0] - point_a[0]) * fraction
+        lon = point_a[1] + (point_b[1] - point_a[1]) * fraction
+        alt = altitudes[i % len(altitudes)]
+        points.append((lat, lon, alt))
+
+    total_distance_km = geodesic(point_a, point_b).kilometers
+
+    # Calculate distances between points
+    distances = []
+    for i in range(len(points) - 1):
+        d = geodesic(
+            (points[i][0], points[i][1]),
+            (points[i + 1][0], points[i + 1][1]),
+        ).meters
+        distances.append(d)
+
+    return Route(points=points, distances=distances, total_km=total_distance_km)
@@ -0,0 +1,343 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import (
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from aiogram.methods import SendMessage, TelegramMethod
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 4096
+
+# SendMessage fields that may differ between coalesced messages
+_MERGE_IGNORED_FIELDS = {"text", "reply_markup"}
+
+
+class TunedAiohttpSession(AiohttpSession):
+    def __init__(self, limit: int = 100, keepalive_timeout: float = 60.0, **kwargs):
+        """
+        Single shared aiohttp session with longer keep-alive, so bursts of
+        sends reuse warm TLS connections to the Bot API.
+
+        :param limit: maximum simultaneous connections
+        :param keepalive_timeout: seconds an idle connection is kept open
+        """
+        super().__init__(limit=limit, **kwargs)
+        self._connector_init["keepalive_timeout"] = keepalive_timeout
+
+
+class _TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill(time.monotonic())
+        self.tokens -= 1
+
+    async def acquire(self):
+        while (wait := self.delay()) > 0:
+            await asyncio.sleep(wait)
+        self.take()
+
+
+class _Job:
+    __slots__ = ("make_request", "bot", "method", "futures", "enqueued_at", "attempts")
+
+    def __init__(self, make_request, bot: Bot, method: TelegramMethod):
+        self.make_request = make_request
+        self.bot = bot
+        self.method = method
+        self.futures: List[asyncio.Future] = [asyncio.get_running_loop().create_future()]
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+
+
+def _is_scheduled(method: TelegramMethod) -> bool:
+    """Only chat-bound send* methods are queued; everything else passes through"""
+    return (
+        type(method).__name__.startswith("Send")
+        and getattr(method, "chat_id", None) is not None
+    )
+
+
+def _can_merge(first: TelegramMethod, second: TelegramMethod) -> bool:
+    if not (isinstance(first, SendMessage) and isinstance(second, SendMessage)):
+        return False
+    if first.reply_markup is not None or first.entities or second.entities:
+        return False
+    if len(first.text) + 1 + len(second.text) > MAX_MESSAGE_LENGTH:
+        return False
+    return all(
+        getattr(first, name) == getattr(second, name)
+        for name in SendMessage.model_fields
+        if name not in _MERGE_IGNORED_FIELDS
+    )
+
+
+class OutboundScheduler(BaseRequestMiddleware):
+    def __init__(
+        self,
+        global_rate: float = 25.0,
+        chat_rate: float = 1.0,
+        chat_burst: int = 3,
+        group_rate: float = 20 / 60,
+        max_retries: int = 5,
+        workers: int = 8,
+    ):
+        """
+        Request middleware that queues every outgoing send per chat.
+
+        Sends are paced by a global token bucket and a per-chat bucket
+        (group chats are slower), ``retry_after`` from 429 responses is
+        honoured per chat, and consecutive text messages queued for the
+        same chat are coalesced into one while they fit the length limit.
+
+        :param global_rate: sends per second across all chats
+        :param chat_rate: sends per second in a private chat
+        :param chat_burst: sends allowed back-to-back in one chat
+        :param group_rate: sends per second in a group chat
+        :param max_retries: retries for flood/network/server errors
+        :param workers: concurrent senders
+        """
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self.workers = workers
+
+        self._global = _TokenBucket(global_rate, global_rate)
+        self._chat_buckets: Dict[int, _TokenBucket] = {}
+        self._queues: Dict[int, Deque[_Job]] = {}
+        self._ready: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.sent = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.failed = 0
+        self._latencies: Deque[float] = deque(maxlen=1024)
+        self._latency_max = 0.0
+
+    # ===================== LIFECYCLE =====================
+
+    def _ensure_started(self):
+        if self._ready is None:
+            self._ready = asyncio.Queue()
+            self._tasks = [
+                asyncio.create_task(self._worker()) for _ in range(self.workers)
+            ]
+
+    async def stop(self, timeout: float = 10.0):
+        """Drain queued sends (up to ``timeout``) and stop workers"""
+        deadline = time.monotonic() + timeout
+        while self._queues and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._ready = None
+
+    # ===================== MIDDLEWARE =====================
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod,
+    ):
+        if not _is_scheduled(method):
+            return await make_request(bot, method)
+
+        self._ensure_started()
+        job = _Job(make_request, bot, method)
+        chat_id = method.chat_id
+
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = self._queues[chat_id] = deque()
+            queue.append(job)
+            self._schedule(chat_id)
+        else:
+            queue.append(job)
+
+        return await job.futures[0]
+
+    # ===================== SCHEDULING =====================
+
+    def _chat_bucket(self, chat_id) -> _TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            rate = self.group_rate if is_group else self.chat_rate
+            bucket = self._chat_buckets[chat_id] = _TokenBucket(rate, self.chat_burst)
+        return bucket
+
+    def _prune_buckets(self, max_buckets: int = 10_000):
+        """Forget idle chats whose bucket has fully refilled"""
+        if len(self._chat_buckets) <= max_buckets:
+            return
+        for chat_id, bucket in list(self._chat_buckets.items()):
+            bucket.delay()  # refill
+            if chat_id not in self._queues and bucket.tokens >= bucket.burst:
+                del self._chat_buckets[chat_id]
+
+    def _schedule(self, chat_id, delay: Optional[float] = None):
+        """Hand the chat to workers once its bucket allows a send"""
+        if delay is None:
+            delay = self._chat_bucket(chat_id).delay()
+        if delay > 0:
+            asyncio.get_running_loop().call_later(delay, self._ready.put_nowait, chat_id)
+        else:
+            self._ready.put_nowait(chat_id)
+
+    def _next_job(self, queue: Deque[_Job]) -> _Job:
+        """Pop the head job, merging following mergeable text messages"""
+        job = queue.popleft()
+        while queue and _can_merge(job.method, queue[0].method):
+            other = queue.popleft()
+            job.method = job.method.model_copy(
+                update={
+                    "text": f"{job.method.text}\n{other.method.text}",
+                    "reply_markup": other.method.reply_markup,
+                }
+            )
+            job.futures.extend(other.futures)
+            job.enqueued_at = min(job.enqueued_at, other.enqueued_at)
+            self.coalesced += 1
+        return job
+
+    async def _worker(self):
+        while True:
+            chat_id = await self._ready.get()
+            queue = self._queues.get(chat_id)
+            if not queue:
+                self._queues.pop(chat_id, None)
+                continue
+
+            await self._global.acquire()
+            self._chat_bucket(chat_id).take()
+            job = self._next_job(queue)
+            retry_in = await self._send(job)
+
+            if retry_in is not None:
+                queue.appendleft(job)
+
+            if queue:
+                self._schedule(chat_id, retry_in)
+            else:
+                del self._queues[chat_id]
+                self._prune_buckets()
+
+    async def _send(self, job: _Job) -> Optional[float]:
+        """
+        Perform the request; return a delay if the job must be retried.
+        """
+        self._record_latency(time.monotonic() - job.enqueued_at)
+        try:
+            result = await job.make_request(job.bot, job.method)
+        except TelegramRetryAfter as e:
+            return self._retry_or_fail(job, e, e.retry_after)
+        except (TelegramNetworkError, TelegramServerError) as e:
+            return self._retry_or_fail(job, e, min(2 ** job.attempts, 30))
+        except Exception as e:
+            self._finish(job, error=e)
+            return None
+
+        self.sent += 1
+        self._finish(job, result=result)
+        return None
+
+    def _retry_or_fail(self, job: _Job, error: Exception, delay: float) -> Optional[float]:
+        job.attempts += 1
+        if job.attempts > self.max_retries:
+            self._finish(job, error=error)
+            return None
+        self.retries += 1
+        logger.warning(f"Send to {job.method.chat_id} retried in {delay}s: {error}")
+        return float(delay)
+
+    def _finish(self, job: _Job, result: Any = None, error: Optional[Exception] = None):
+        if error is not None:
+            self.failed += 1
+            logger.warning(f"Send to {job.method.chat_id} failed: {error}")
+        for future in job.futures:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    # ===================== METRICS =====================
+
+    def _record_latency(self, latency: float):
+        self._latencies.append(latency)
+        self._latency_max = max(self._latency_max, latency)
+
+    def stats(self) -> Dict[str, float]:
+        """Return counters and queue latency (seconds) over recent sends"""
+        latencies = sorted(self._latencies)
+        p50 = latencies[len(latencies) // 2] if latencies else 0.0
+        p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0.0
+        return {
+            "queued_chats": len(self._queues),
+            "queued": sum(len(q) for q in self._queues.values()),
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "failed": self.failed,
+            "latency_p50": p50,
+            "latency_p95": p95,
+            "latency_max": self._latency_max,
+        }
+
+
+async def broadcast(bot: Bot, chat_ids: Iterable[int], text: str, **kwargs) -> int:
+    """
+    Queue one message to many chats at once and log failures.
+
+    :return: number of chats the message was delivered to
+    """
+    chat_ids = list(chat_ids)
+    results = await asyncio.gather(
+        *(bot.send_message(chat_id, text, **kwargs) for chat_id in chat_ids),
+        return_exceptions=True,
+    )
+    delivered = 0
+    for chat_id, result in zip(chat_ids, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Could not deliver message to {chat_id}: {result}")
+        else:
+            delivered += 1
+    return delivered
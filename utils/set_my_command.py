@@ -14,6 +14,14 @@ async def set_default_commands(bot):
             command="coordinate",
             description="🧭 Calculate distance between coordinates"
         ),
+        BotCommand(
+            command="survey",
+            description="🗺 Generate area survey mission"
+        ),
+        BotCommand(
+            command="matrix",
+            description="📊 Distance matrix for many points"
+        ),
         BotCommand(
             command="history",
             description="📜 View your recent calculations"
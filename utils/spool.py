@@ -0,0 +1,273 @@
+import asyncio
+import base64
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from utils.database import Database, DatabaseUnavailable
+
+logger = logging.getLogger(__name__)
+
+
+class RecordSpool:
+    def __init__(
+        self,
+        db: Database,
+        path: str = "spool/records.journal",
+        flush_interval: float = 0.05,
+        replay_interval: float = 15.0,
+    ):
+        """
+        Durable local journal for user and calculation records.
+
+        Records that cannot reach PostgreSQL are appended to a JSON-lines
+        journal. Appends are group-committed: writers wait for one shared
+        fsync per ``flush_interval`` window. A background task replays
+        the journal into the database once it is reachable again;
+        replay is idempotent (``client_id`` / ``ON CONFLICT``). Records
+        the database rejects are moved to a ``.dead`` file so one bad
+        record cannot block the rest of the journal.
+
+        :param db: database wrapper
+        :param path: journal file path
+        :param flush_interval: batching window for fsync in seconds
+        :param replay_interval: seconds between replay attempts
+        """
+        self.db = db
+        self.path = path
+        self.replay_path = path + ".replay"
+        self.dead_path = path + ".dead"
+        self.flush_interval = flush_interval
+        self.replay_interval = replay_interval
+
+        self._file = None
+        self._lock = asyncio.Lock()
+        self._waiters: List[asyncio.Future] = []
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+        self.spooled = 0
+        self.replayed = 0
+        self.dead_lettered = 0
+
+    # ===================== LIFECYCLE =====================
+
+    async def start(self):
+        """Open the journal and start flusher and replayer tasks"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "ab")
+        self._tasks = [
+            asyncio.create_task(self._flusher()),
+            asyncio.create_task(self._replayer()),
+        ]
+
+    async def stop(self):
+        """Stop background tasks and sync the journal"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._file:
+            await asyncio.to_thread(self._sync)
+            self._release_waiters(self._waiters)
+            self._waiters = []
+            self._file.close()
+            self._file = None
+
+    # ===================== PUBLIC API =====================
+
+    async def add_user(
+        self,
+        telegram_id: int,
+        full_name: str,
+        username: Optional[str] = None,
+    ):
+        """Insert user, or journal it if the database is unavailable"""
+        data = {
+            "telegram_id": telegram_id,
+            "full_name": full_name,
+            "username": username,
+        }
+        try:
+            await self.db.add_user(**data)
+        except DatabaseUnavailable as e:
+            logger.warning(f"Database unavailable, spooling user {telegram_id}: {e}")
+            await self._append("user", data)
+
+    async def add_calculation(
+        self,
+        user_id: int,
+        coord_a: str,
+        coord_b: str,
+        segments: int,
+        result: str,
+        waypoints: Optional[bytes] = None,
+    ):
+        """Insert calculation, or journal it if the database is unavailable"""
+        data = {
+            "user_id": user_id,
+            "coord_a": coord_a,
+            "coord_b": coord_b,
+            "segments": segments,
+            "result": result,
+            "client_id": uuid.uuid4().hex,
+        }
+        try:
+            await self.db.add_calculation(**data, waypoints=waypoints)
+        except DatabaseUnavailable as e:
+            logger.warning(f"Database unavailable, spooling calculation of {user_id}: {e}")
+            data["created_at"] = datetime.now().isoformat()
+            if waypoints is not None:
+                data["waypoints"] = base64.b64encode(waypoints).decode("ascii")
+            await self._append("calculation", data)
+
+    # ===================== JOURNAL =====================
+
+    async def _append(self, kind: str, data: Dict[str, Any]):
+        """Append a record and wait until it is fsynced"""
+        line = json.dumps({"kind": kind, "data": data}, ensure_ascii=False) + "\n"
+        waiter = asyncio.get_running_loop().create_future()
+
+        # Under the lock, so a flush or rotation in progress either covers
+        # this record or leaves it (and its waiter) to the next one
+        async with self._lock:
+            if self._file is None:
+                raise DatabaseUnavailable("database is down and spool is not started")
+            self._file.write(line.encode("utf-8"))
+            self._waiters.append(waiter)
+            self.spooled += 1
+
+        self._wake.set()
+        await waiter
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    @staticmethod
+    def _release_waiters(waiters: List[asyncio.Future], error: Optional[Exception] = None):
+        for waiter in waiters:
+            if waiter.done():
+                continue
+            if error:
+                waiter.set_exception(error)
+            else:
+                waiter.set_result(None)
+
+    async def _flusher(self):
+        """Group commit: one fsync for every record written in the window"""
+        while True:
+            await self._wake.wait()
+            await asyncio.sleep(self.flush_interval)
+            self._wake.clear()
+
+            async with self._lock:
+                waiters, self._waiters = self._waiters, []
+                try:
+                    await asyncio.to_thread(self._sync)
+                except Exception as e:
+                    logger.exception("Spool fsync failed")
+                    self._release_waiters(waiters, e)
+                else:
+                    self._release_waiters(waiters)
+
+    # ===================== REPLAY =====================
+
+    async def _replayer(self):
+        while True:
+            await asyncio.sleep(self.replay_interval)
+            try:
+                await self.replay()
+            except Exception:
+                logger.exception("Spool replay failed")
+
+    async def _rotate(self) -> bool:
+        """Move the live journal aside for replay; return False if empty"""
+        async with self._lock:
+            if self._file.tell() == 0:
+                return False
+            await asyncio.to_thread(self._sync)
+            self._file.close()
+            os.replace(self.path, self.replay_path)
+            self._file = open(self.path, "ab")
+            # Appends take the lock, so every pending waiter's record
+            # was written before the sync above
+            self._release_waiters(self._waiters)
+            self._waiters = []
+            return True
+
+    async def replay(self) -> int:
+        """
+        Drain journaled records into the database.
+
+        :return: number of records replayed
+        """
+        if not self.db.breaker.allow():
+            return 0
+        if not os.path.exists(self.replay_path) and not await self._rotate():
+            return 0
+
+        with open(self.replay_path, "rb") as f:
+            lines = f.read().splitlines()
+
+        count = 0
+        for position, raw in enumerate(lines):
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                # Torn tail of a write interrupted by a crash
+                logger.warning("Skipping corrupt spool record")
+                continue
+
+            try:
+                await self._apply(record)
+            except DatabaseUnavailable:
+                # Keep only the rest, so set-aside records are not retried
+                await asyncio.to_thread(self._truncate_replay, lines[position:])
+                self.replayed += count
+                logger.warning(f"Spool replay interrupted after {count} records")
+                return count
+            except Exception as e:
+                # Rejected by the database (constraint, bad data): set aside
+                logger.error(f"Moving spool record to {self.dead_path}: {e!r}")
+                self._dead_letter(raw)
+                continue
+            count += 1
+
+        os.remove(self.replay_path)
+        self.replayed += count
+        logger.info(f"📥 Replayed {count} spooled records into database")
+        return count
+
+    async def _apply(self, record: Dict[str, Any]):
+        data = record["data"]
+        if record["kind"] == "user":
+            await self.db.add_user(**data)
+        elif record["kind"] == "calculation":
+            data["created_at"] = datetime.fromisoformat(data["created_at"])
+            if data.get("waypoints"):
+                data["waypoints"] = base64.b64decode(data["waypoints"])
+            await self.db.add_calculation(**data)
+        else:
+            raise ValueError(f"unknown record kind {record['kind']!r}")
+
+    def _truncate_replay(self, lines: List[bytes]):
+        tmp_path = self.replay_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(line + b"\n" for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.replay_path)
+
+    def _dead_letter(self, raw: bytes):
+        with open(self.dead_path, "ab") as f:
+            f.write(raw + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.dead_lettered += 1
@@ -0,0 +1,189 @@
+import math
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# INAV keeps at most 120 waypoints in a single mission
+MAX_MISSION_WAYPOINTS = 120
+
+# Upper bound for one survey (all missions together)
+MAX_SURVEY_WAYPOINTS = 10_000
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+# ===================== PROJECTION =====================
+
+def _to_local(latlon: np.ndarray, origin: Tuple[float, float]) -> np.ndarray:
+    """Project (lat, lon) degrees to local east/north meters around origin"""
+    lat0, lon0 = np.radians(origin)
+    lat = np.radians(latlon[:, 0])
+    lon = np.radians(latlon[:, 1])
+    x = (lon - lon0) * math.cos(lat0) * EARTH_RADIUS_M
+    y = (lat - lat0) * EARTH_RADIUS_M
+    return np.column_stack((x, y))
+
+
+def _to_latlon(xy: np.ndarray, origin: Tuple[float, float]) -> np.ndarray:
+    """Inverse of :func:`_to_local`"""
+    lat0, lon0 = np.radians(origin)
+    lat = xy[:, 1] / EARTH_RADIUS_M + lat0
+    lon = xy[:, 0] / (math.cos(lat0) * EARTH_RADIUS_M) + lon0
+    return np.degrees(np.column_stack((lat, lon)))
+
+
+def _rotation(angle_rad: float) -> np.ndarray:
+    c, s = math.cos(angle_rad), math.sin(angle_rad)
+    return np.array([[c, -s], [s, c]])
+
+
+# ===================== SWEEP GENERATION =====================
+
+class SurveyTooLarge(ValueError):
+    """Sweep would exceed the waypoint limit; raised before generation"""
+
+    def __init__(self, estimated: int, limit: int):
+        super().__init__(f"Survey needs at least {estimated} waypoints (limit {limit})")
+        self.estimated = estimated
+        self.limit = limit
+
+
+def generate_survey(
+    polygon: Sequence[Tuple[float, float]],
+    spacing_m: float,
+    heading_deg: float = 0.0,
+    max_waypoints: int = MAX_SURVEY_WAYPOINTS,
+) -> np.ndarray:
+    """
+    Generate a back-and-forth (lawnmower) sweep over a polygon.
+
+    Sweep lines run along ``heading_deg`` (0 = north, 90 = east) and are
+    ``spacing_m`` apart. All scan line / edge intersections are computed
+    in one broadcast over (lines × edges).
+
+    :param polygon: polygon vertices as (lat, lon); closing vertex optional
+    :param spacing_m: distance between neighbouring sweep lines in meters
+    :param heading_deg: direction of the sweep lines in degrees
+    :param max_waypoints: limit checked from the line count before any
+                          (lines × edges) array is allocated
+    :return: array of shape (N, 2) with waypoint (lat, lon)
+    :raises SurveyTooLarge: spacing is too small for the polygon
+    """
+    if spacing_m <= 0:
+        raise ValueError("Line spacing must be positive")
+
+    vertices = np.asarray(polygon, dtype=np.float64)
+    if len(vertices) > 1 and np.array_equal(vertices[0], vertices[-1]):
+        vertices = vertices[:-1]
+    if len(vertices) < 3:
+        raise ValueError("Polygon needs at least 3 vertices")
+
+    origin = tuple(vertices.mean(axis=0))
+
+    # Rotate so sweep lines become horizontal (parallel to the x axis):
+    # heading is measured clockwise from north, x axis points east.
+    angle = math.radians(90.0 - heading_deg)
+    local = _to_local(vertices, origin) @ _rotation(-angle).T
+
+    start = local
+    end = np.roll(local, -1, axis=0)
+
+    y_min, y_max = local[:, 1].min(), local[:, 1].max()
+
+    # Every sweep line gives at least an entry and an exit waypoint
+    estimated_lines = (y_max - y_min) / spacing_m
+    if 2 * estimated_lines > max_waypoints:
+        raise SurveyTooLarge(int(2 * estimated_lines), max_waypoints)
+
+    levels = np.arange(y_min + spacing_m / 2, y_max, spacing_m)
+    if levels.size == 0:
+        levels = np.array([(y_min + y_max) / 2])
+
+    # Broadcast: levels (L, 1) against edges (1, E)
+    y0, y1 = start[None, :, 1], end[None, :, 1]
+    x0, x1 = start[None, :, 0], end[None, :, 0]
+    ys = levels[:, None]
+
+    # Half-open rule so shared vertices are counted once
+    crosses = (ys >= np.minimum(y0, y1)) & (ys < np.maximum(y0, y1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xs = x0 + (ys - y0) * (x1 - x0) / (y1 - y0)
+    xs = np.where(crosses, xs, np.nan)
+    xs.sort(axis=1)  # NaNs go last
+
+    counts = crosses.sum(axis=1)
+    waypoints: List[np.ndarray] = []
+    reverse = False
+
+    for row, count, y in zip(xs, counts, levels):
+        if count < 2:
+            continue
+        # Entry/exit pairs along the line (concave polygons give several)
+        pairs = row[: count - count % 2].reshape(-1, 2)
+        if reverse:
+            pairs = pairs[::-1, ::-1]
+        line = np.column_stack((pairs.ravel(), np.full(pairs.size, y)))
+        waypoints.append(line)
+        reverse = not reverse
+
+    if not waypoints:
+        raise ValueError("Polygon is too small for the chosen spacing")
+
+    track = np.vstack(waypoints) @ _rotation(angle).T
+    return _to_latlon(track, origin)
+
+
+def track_length_m(points: np.ndarray) -> float:
+    """Total length of a (lat, lon) track in meters (haversine)"""
+    if len(points) < 2:
+        return 0.0
+    lat = np.radians(points[:, 0])
+    lon = np.radians(points[:, 1])
+    dlat = np.diff(lat)
+    dlon = np.diff(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlon / 2) ** 2
+    return float(2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a)).sum())
+
+
+# ===================== MISSION SPLITTING =====================
+
+def chunk_waypoints(
+    waypoints: Sequence[Tuple[float, float, int]],
+    limit: int = MAX_MISSION_WAYPOINTS,
+) -> List[List[Tuple[float, float, int]]]:
+    """
+    Split waypoints into missions of at most ``limit`` waypoints.
+
+    Each following mission starts at the last waypoint of the previous
+    one so the track stays continuous.
+
+    :param waypoints: sequence of (lat, lon, alt)
+    :param limit: maximum waypoints per mission
+    :return: list of waypoint lists ready for :func:`build_mission_xml`
+    """
+    if limit < 2:
+        raise ValueError("Mission limit must be at least 2 waypoints")
+
+    waypoints = list(waypoints)
+    step = limit - 1
+    return [
+        waypoints[begin: begin + limit]
+        for begin in range(0, max(len(waypoints) - 1, 1), step)
+    ]
+
+
+def split_missions(
+    points: np.ndarray,
+    altitude: int,
+    limit: int = MAX_MISSION_WAYPOINTS,
+) -> List[List[Tuple[float, float, int]]]:
+    """
+    Split a long (lat, lon) track flown at one altitude into missions.
+
+    :param points: array of (lat, lon)
+    :param altitude: altitude for every waypoint in meters
+    :param limit: maximum waypoints per mission
+    :return: list of waypoint lists ready for :func:`build_mission_xml`
+    """
+    waypoints = [(float(lat), float(lon), altitude) for lat, lon in points]
+    return chunk_waypoints(waypoints, limit)
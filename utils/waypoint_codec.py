@@ -0,0 +1,70 @@
+import struct
+import zlib
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+Waypoint = Tuple[float, float, int]
+
+FORMAT_VERSION = 1
+
+# Header flags
+FLAG_SPLIT_MISSIONS = 0x01
+
+# version, flags, waypoint count
+_HEADER = struct.Struct("<BBI")
+
+# INAV stores coordinates as integer 1e-7 degrees, so nothing is lost
+COORD_SCALE = 10_000_000
+
+
+def encode_waypoints(points: Sequence[Waypoint], split_missions: bool = False) -> bytes:
+    """
+    Pack waypoints into a compact binary blob.
+
+    Layout: header, then zlib of int32 delta-encoded lat and lon
+    (1e-7 degrees, like INAV) followed by int16 altitudes. Deltas are
+    stored modulo 2**32 and restored with a wrapping cumulative sum.
+
+    :param points: sequence of (lat, lon, alt)
+    :param split_missions: route was sent as several INAV missions
+    :return: encoded bytes
+    """
+    array = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+
+    coords = np.rint(array[:, :2] * COORD_SCALE).astype(np.int64)
+    deltas = np.diff(coords, axis=0, prepend=0).astype(np.int32)
+
+    altitudes = array[:, 2]
+    if altitudes.size and (altitudes.min() < -32768 or altitudes.max() > 32767):
+        raise ValueError("Altitude does not fit into int16")
+
+    payload = (
+        deltas[:, 0].astype("<i4").tobytes()
+        + deltas[:, 1].astype("<i4").tobytes()
+        + altitudes.astype("<i2").tobytes()
+    )
+    flags = FLAG_SPLIT_MISSIONS if split_missions else 0
+    return _HEADER.pack(FORMAT_VERSION, flags, len(array)) + zlib.compress(payload, 6)
+
+
+def decode_waypoints(blob: bytes) -> Tuple[List[Waypoint], bool]:
+    """
+    Inverse of :func:`encode_waypoints`.
+
+    :return: (waypoints, split_missions flag)
+    """
+    version, flags, count = _HEADER.unpack_from(blob)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported waypoint format version: {version}")
+
+    payload = zlib.decompress(blob[_HEADER.size:])
+    lat_deltas = np.frombuffer(payload, dtype="<i4", count=count)
+    lon_deltas = np.frombuffer(payload, dtype="<i4", count=count, offset=4 * count)
+    altitudes = np.frombuffer(payload, dtype="<i2", count=count, offset=8 * count)
+
+    lats = np.cumsum(lat_deltas, dtype=np.int32) / COORD_SCALE
+    lons = np.cumsum(lon_deltas, dtype=np.int32) / COORD_SCALE
+
+    points = list(zip(lats.tolist(), lons.tolist(), altitudes.tolist()))
+    return points, bool(flags & FLAG_SPLIT_MISSIONS)